@@ -1,2 +1,48 @@
+"""
+Hexagonal Lattice
+
+Coordinates are imported with the package, while the modules built on NumPy are imported
+on the first use of their names, so that tools only converting coordinates start fast.
+Matplotlib is imported on the first plot.
+"""
+import importlib
+
 from .coordinates import *
-from .hexLattice import *
\ No newline at end of file
+
+# Names of the modules imported on first use, including the names that used to come with `import *`
+_LAZY_NAMES = {
+    'batchCoordinates': (
+        'ring_coordinates', 'ring_offsets', 'spiral_offsets', 'hex_ring', 'hex_spiral', 'ring_to_index', 'index_to_ring', 'cube_to_ring', 'ring_to_cube', 'cube_neighbours',
+        'cube_rotate', 'cube_reflect', 'cube_distance', 'cube_line',
+        'cube_to_offset', 'offset_to_cube', 'cube_to_axial', 'axial_to_cube', 'cube_to_xy', 'xy_to_cube', 'ring_to_xy',
+        'hexagon_vertices', 'math', 'np'
+    ),
+    'latticeData': (
+        'CELL_SHAPES', 'FIELD_DEFAULTS', 'KeyData', 'CellData', 'LatticeData', 'numbers', 'MutableMapping'
+    ),
+    'hexLattice': (
+        'HexCell', 'HexLattice', 'RowAppender', 'RenderTemplate', 'FIGURE_BACKENDS', 'FIGURE_POLICIES', 'REDUCE_OPS', 'SYMMETRIES',
+        'os', 'PathLike', 'Any', 'Mapping', 'Sequence'
+    ),
+    'batchRender': (
+        'render_batch',
+    ),
+}
+_LAZY_MODULES = {name: module for module, names in _LAZY_NAMES.items() for name in names}
+
+__all__ = ['CubeCoordinate', 'OffsetCoordinate', 'RingCoordinate', 'Coordinate', 'OrderedDict', 'coordinates'] \
+    + list(_LAZY_MODULES) + list(_LAZY_NAMES)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        value = getattr(importlib.import_module(f'.{_LAZY_MODULES[name]}', __name__), name)
+        globals()[name] = value  # Found directly from now on
+        return value
+    if name in _LAZY_NAMES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_MODULES))
@@ -0,0 +1,435 @@
+"""
+Hexagonal Lattice
+Vectorized Conversions of Coordinates
+
+Every function takes NumPy arrays (or anything broadcastable to them) of coordinate components
+and converts all of them at once, following the same conventions as the classes in `coordinates.py`.
+
+@Author: LZK
+@Date: 2023-11-20
+"""
+import math
+import functools
+import numpy as np
+
+# Corner (in unit of ring) and walking direction of the six sectors, in the order of CubeCoordinate.get_ring
+_SECTOR_CORNERS = np.array(
+    [(+1, 0, -1), (+1, -1, 0), (0, -1, +1), (-1, 0, +1), (-1, +1, 0), (0, +1, -1)],
+    dtype=np.int32
+)
+_SECTOR_STEPS = np.array(
+    [(0, -1, +1), (-1, 0, +1), (-1, +1, 0), (0, +1, -1), (+1, 0, -1), (+1, -1, 0)],
+    dtype=np.int32
+)
+
+# Neighbour directions, the same as the walking directions of sectors,
+# both in the order of CubeCoordinate.direction_vectors_dict
+_NEIGHBOUR_STEPS = _SECTOR_STEPS
+
+
+_XY_CHUNK = 1 << 15  # Points converted at once by xy_to_cube
+
+
+def _as_int(value) -> np.ndarray:
+    return np.asarray(value).astype(np.int32, copy=False)
+
+
+def _check_cube(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> None:
+    if np.any(x + y + z != 0):
+        raise ValueError("Input cube coordinates are invalid: x + y + z != 0.")
+
+
+def ring_coordinates(ring: int) -> tuple:
+    """
+    Get the ring coordinates of all cells in a lattice of given rings
+
+    The cells are ordered ring-by-ring, so that cell (r,k) is at flat index `3r(r-1) + 1 + k`.
+
+    Returns
+    -------
+    tuple(r: np.ndarray, k: np.ndarray)
+    """
+    ring_size = np.maximum(6 * np.arange(ring), 1)
+    ring_start = np.cumsum(ring_size) - ring_size
+    r = np.repeat(np.arange(ring, dtype=np.int32), ring_size)
+    k = (np.arange(r.size) - np.repeat(ring_start, ring_size)).astype(np.int32)
+    return r, k
+
+
+@functools.lru_cache(maxsize=256)
+def ring_offsets(ring: int) -> np.ndarray:
+    """
+    Get the cube offsets of the cells at given ring around a center, computed once and cached
+
+    Returns
+    -------
+    np.ndarray of int32 of shape (6*ring, 3), read-only, in the same order as `CubeCoordinate.get_ring`
+    """
+    offsets = np.column_stack(ring_to_cube(np.full(max(6 * ring, 1), ring), np.arange(max(6 * ring, 1))))
+    offsets.flags.writeable = False
+    return offsets
+
+
+@functools.lru_cache(maxsize=64)
+def spiral_offsets(ring: int) -> np.ndarray:
+    """
+    Get the cube offsets of the cells at rings 0 to ring-1 around a center (a filled hexagon), computed once and cached
+
+    Returns
+    -------
+    np.ndarray of int32 of shape (3*ring*(ring-1)+1, 3), read-only, ring-by-ring as `ring_coordinates`
+    """
+    offsets = np.concatenate([ring_offsets(r) for r in range(ring)]) if ring > 0 else np.empty((0, 3), dtype=np.int32)
+    offsets.flags.writeable = False
+    return offsets
+
+
+def hex_ring(x, y, z, ring: int) -> tuple:
+    """
+    Get the cube coordinates of the cells at given ring around centers
+
+    Input
+    -----
+    x, y, z: int or array of int of shape (N,), the centers
+    ring: int, the ring around the centers
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray, z: np.ndarray), each of shape (6*ring,) for a scalar center, or else (N, 6*ring)
+    """
+    return _translate(x, y, z, ring_offsets(ring))
+
+
+def hex_spiral(x, y, z, ring: int) -> tuple:
+    """
+    Get the cube coordinates of the cells at rings 0 to ring-1 around centers, ring-by-ring
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray, z: np.ndarray), the same shapes as `hex_ring`
+    """
+    return _translate(x, y, z, spiral_offsets(ring))
+
+
+def _translate(x, y, z, offsets: np.ndarray) -> tuple:
+    x, y, z = _as_int(x), _as_int(y), _as_int(z)
+    _check_cube(x, y, z)
+    return tuple(np.asarray(component)[..., None] + offsets[:, i] for i, component in enumerate((x, y, z)))
+
+
+def ring_to_index(r, k) -> np.ndarray:
+    """
+    Convert the (ring,clock) coordinates to flat indices of ring-by-ring order
+    """
+    r, k = _as_int(r), _as_int(k)
+    return np.where(r > 0, 3 * r * (r - 1) + 1 + k, 0)
+
+
+def index_to_ring(index) -> tuple:
+    """
+    Convert flat indices of ring-by-ring order to the (ring,clock) coordinates
+
+    Returns
+    -------
+    tuple(r: np.ndarray, k: np.ndarray)
+    """
+    index = _as_int(index)
+    # Largest r with 3r(r-1) + 1 <= index, corrected for the rounding of sqrt
+    r = np.floor(0.5 + np.sqrt(np.maximum(4 * index - 1, 0) / 12.)).astype(np.int32)
+    r -= (index > 0) & (3 * r * (r - 1) + 1 > index)
+    r += (index > 0) & (3 * r * (r + 1) + 1 <= index)
+    k = np.where(r > 0, index - 3 * r * (r - 1) - 1, 0)
+    return r, k.astype(np.int32)
+
+
+def cube_to_ring(x, y, z) -> tuple:
+    """
+    Convert the cube coordinates to (ring,clock) coordinates, see `CubeCoordinate.to_ring`
+
+    Returns
+    -------
+    tuple(r: np.ndarray, k: np.ndarray)
+    """
+    x, y, z = _as_int(x), _as_int(y), _as_int(z)
+    _check_cube(x, y, z)
+    r = (np.abs(x) + np.abs(y) + np.abs(z)) // 2
+    k = np.select(
+        [r == 0, (x == r) & (y > -r), (y == -r) & (x > 0), (z == r) & (x > -r), (x == -r) & (y < r)],
+        [0, -y, 2 * r - x, 2 * r - x, 3 * r + y],
+        default = 5 * r + x
+    )
+    return r, k.astype(np.int32)
+
+
+def ring_to_cube(r, k) -> tuple:
+    """
+    Convert the (ring,clock) coordinates to cube coordinates, see `RingCoordinate.to_cube`
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray, z: np.ndarray)
+    """
+    r, k = np.broadcast_arrays(_as_int(r), _as_int(k))
+    if np.any((r < 0) | (k < 0) | (k >= np.maximum(6 * r, 1))):
+        raise ValueError("Input ring coordinates are out of range.")
+
+    # Walk from the corner of sector to the seat
+    sector, seat = np.divmod(k, np.maximum(r, 1))
+    return tuple(
+        r * _SECTOR_CORNERS[sector, i] + seat * _SECTOR_STEPS[sector, i] for i in range(3)
+    )
+
+
+def cube_neighbours(x, y, z) -> tuple:
+    """
+    Get the six neighbours of cube coordinates, see `CubeCoordinate.get_all_neighbours`
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray, z: np.ndarray), each of shape (N, 6)
+    """
+    x, y, z = _as_int(x), _as_int(y), _as_int(z)
+    _check_cube(x, y, z)
+    return tuple(
+        np.atleast_1d(component)[:, None] + _NEIGHBOUR_STEPS[:, i] for i, component in enumerate((x, y, z))
+    )
+
+
+def cube_rotate(x, y, z, steps: int = 1) -> tuple:
+    """
+    Rotate cube coordinates about the original point by steps of 60 degrees clockwise,
+    where one step moves a cell from sector `k // r` to the next one (see `CubeCoordinate.to_ring`)
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray, z: np.ndarray)
+    """
+    x, y, z = _as_int(x), _as_int(y), _as_int(z)
+    _check_cube(x, y, z)
+    steps %= 6
+    # One step maps (x, y, z) to (-z, -x, -y), so that two steps permute the components to (y, z, x)
+    x, y, z = ((x, y, z), (y, z, x), (z, x, y))[steps // 2]
+    return (-z, -x, -y) if steps % 2 else (x, y, z)
+
+
+def cube_reflect(x, y, z) -> tuple:
+    """
+    Reflect cube coordinates about the axis through the middle of sector 0 (the direction (2, -1, -1)),
+    which maps the clock index k at ring r to (r - k) mod 6r
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray, z: np.ndarray)
+    """
+    x, y, z = _as_int(x), _as_int(y), _as_int(z)
+    _check_cube(x, y, z)
+    return x, z, y
+
+
+def cube_distance(x1, y1, z1, x2=0, y2=0, z2=0) -> np.ndarray:
+    """
+    Get the hex distances (number of steps between neighbours) between cube coordinates, see `CubeCoordinate.distance`
+
+    The inputs are broadcast, so that e.g. `cube_distance(x[:, None], y[:, None], z[:, None], x, y, z)`
+    gives the matrix of distances between all pairs.
+
+    Returns
+    -------
+    np.ndarray of int32, the distances to (x2, y2, z2), or to the original point by default
+    """
+    x1, y1, z1, x2, y2, z2 = (_as_int(_) for _ in (x1, y1, z1, x2, y2, z2))
+    _check_cube(x1, y1, z1)
+    _check_cube(x2, y2, z2)
+    # The largest of |dx|, |dy|, |dz|, where dy = - dx - dz
+    dx, dz = x1 - x2, z1 - z2
+    return np.maximum(np.maximum(np.abs(dx), np.abs(dz)), np.abs(dx + dz))
+
+
+def cube_line(x1, y1, z1, x2, y2, z2) -> tuple:
+    """
+    Get the cube coordinates of the cells crossed by the line between the centers of two cells
+
+    The line is sampled at every step of the hex distance and rounded to the nearest cells (cube rounding),
+    with the ties on an edge always going to the same side.
+
+    Input
+    -----
+    x1, y1, z1: int, the starting cell
+    x2, y2, z2: int, the ending cell
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray, z: np.ndarray) of int32, of shape (distance+1,), from the starting cell
+    to the ending cell, where every cell is a neighbour of the previous one
+    """
+    start, end = (int(x1), int(y1), int(z1)), (int(x2), int(y2), int(z2))
+    if sum(start) != 0 or sum(end) != 0:
+        raise ValueError(f"Input cube coordinates are invalid: {start}, {end}")
+    distance = max(abs(a - b) for a, b in zip(start, end))
+    t = np.arange(distance + 1) / max(distance, 1)
+    # Nudged off the edges between cells, keeping x + y + z = 0
+    fx, fy, fz = (a + 1E-6 * n + (b - a) * t for a, b, n in zip(start, end, (1., 2., -3.)))
+    rx, ry = _cube_round(fx, fy, fz)
+    x, y = rx.astype(np.int32), ry.astype(np.int32)
+    return x, y, - x - y
+
+
+def cube_to_offset(x, y, z) -> tuple:
+    """
+    Convert the cube coordinates to offset coordinates, see `CubeCoordinate.to_offset`
+
+    Returns
+    -------
+    tuple(row: np.ndarray, col: np.ndarray)
+    """
+    x, y, z = _as_int(x), _as_int(y), _as_int(z)
+    _check_cube(x, y, z)
+    return z, x + (z - (z & 1)) // 2
+
+
+def offset_to_cube(row, col) -> tuple:
+    """
+    Convert the offset coordinates to cube coordinates, see `OffsetCoordinate.to_cube`
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray, z: np.ndarray)
+    """
+    row, col = _as_int(row), _as_int(col)
+    x = col - (row - (row & 1)) // 2
+    return x, - x - row, row
+
+
+def cube_to_axial(x, y, z, ring: int) -> tuple:
+    """
+    Convert the cube coordinates to the (row,column) coordinates of a lattice of given rings
+
+    Rows go from top to bottom and columns from left to right,
+    the same as `HexLattice.generate_ring_axial_hash`.
+
+    Returns
+    -------
+    tuple(row: np.ndarray, col: np.ndarray)
+    """
+    x, y, z = _as_int(x), _as_int(y), _as_int(z)
+    _check_cube(x, y, z)
+    return z + (ring - 1), x + (ring - 1) + np.minimum(z, 0)
+
+
+def axial_to_cube(row, col, ring: int) -> tuple:
+    """
+    Convert the (row,column) coordinates of a lattice of given rings to cube coordinates
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray, z: np.ndarray)
+    """
+    row, col = _as_int(row), _as_int(col)
+    z = row - (ring - 1)
+    x = col - (ring - 1) - np.minimum(z, 0)
+    return x, - x - z, z
+
+
+def cube_to_xy(x, y, z, pitch: float = 1.0) -> tuple:
+    """
+    Convert the cube coordinates to (x,y) Cartesian coordinates of cell centers, see `HexCell.rk2xy`
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray) of float64
+    """
+    x, y = _as_int(x), _as_int(y)
+    return 0.5 * pitch * (x - y), 0.5 * math.sqrt(3) * pitch * (x + y)
+
+
+def xy_to_cube(x, y, pitch: float = 1.0, orientation: float = 0.) -> tuple:
+    """
+    Locate the cells containing (x,y) Cartesian points, the inverse of `cube_to_xy`
+
+    Points are converted to fractional cube coordinates and rounded to the nearest cell (cube rounding),
+    where points on an edge go to either side.
+
+    Input
+    -----
+    x, y: array of float, the points
+    pitch: float, the pitch of lattice
+    orientation: float, the rotation angle of the lattice about the origin
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray, z: np.ndarray) of int32
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+    shape = x.shape
+    x, y = x.ravel(), y.ravel()
+    if orientation:
+        cos, sin = math.cos(orientation), math.sin(orientation)
+        x, y = cos * x + sin * y, - sin * x + cos * y
+
+    res_x, res_y = np.empty(x.size, dtype=np.int32), np.empty(x.size, dtype=np.int32)
+    # Chunks small enough for the temporary arrays to stay in cache
+    for start in range(0, x.size, _XY_CHUNK):
+        stop = min(start + _XY_CHUNK, x.size)
+        u = x[start:stop] * (1. / pitch)
+        v = y[start:stop] * (1. / (math.sqrt(3) * pitch))
+
+        # Fractional cube coordinates
+        fx = v + u
+        fy = np.subtract(v, u)
+        fz = np.multiply(v, -2., out=v)
+        rx, ry = _cube_round(fx, fy, fz)
+
+        res_x[start:stop] = rx
+        res_y[start:stop] = ry
+    res_x, res_y = res_x.reshape(shape), res_y.reshape(shape)
+    return res_x, res_y, - res_x - res_y
+
+
+def _cube_round(fx: np.ndarray, fy: np.ndarray, fz: np.ndarray) -> tuple:
+    # Round every component, and fix the one with the largest rounding error so that x + y + z = 0.
+    # The fractional components are overwritten, and the rounded (x, y) are returned as float arrays.
+    rx, ry, rz = np.rint(fx), np.rint(fy), np.rint(fz)
+    dx = np.abs(np.subtract(rx, fx, out=fx), out=fx)
+    dy = np.abs(np.subtract(ry, fy, out=fy), out=fy)
+    dz = np.abs(np.subtract(rz, fz, out=fz), out=fz)
+    fix_x = (dx > dy) & (dx > dz)
+    fix_y = dy > dz
+    fix_y &= ~fix_x
+    np.copyto(rx, np.negative(np.add(ry, rz, out=fx), out=fx), where=fix_x)
+    np.copyto(ry, np.negative(np.add(rx, rz, out=fy), out=fy), where=fix_y)
+    return rx, ry
+
+
+def ring_to_xy(r, k, pitch: float = 1.0) -> tuple:
+    """
+    Convert the (ring,clock) coordinates to (x,y) Cartesian coordinates of cell centers
+
+    Returns
+    -------
+    tuple(x: np.ndarray, y: np.ndarray) of float64
+    """
+    x, y, z = ring_to_cube(r, k)
+    return cube_to_xy(x, y, z, pitch=pitch)
+
+
+def hexagon_vertices(center_x, center_y, pitch, orientation=0.) -> np.ndarray:
+    """
+    Get the six vertices of hexagonal cells, in the same order as `HexCell.surround_points`
+
+    Input
+    -----
+    center_x, center_y: array of float, the central points of cells
+    pitch: float or array of float, the pitch (distance between opposite edges) of cells
+    orientation: float or array of float, the rotation angle of cells
+
+    Returns
+    -------
+    np.ndarray of shape (N, 6, 2)
+    """
+    center_x, center_y = np.atleast_1d(center_x), np.atleast_1d(center_y)
+    radius = np.asarray(pitch, dtype=np.float64)[..., None] / math.sqrt(3)  # Distance between center and vertex
+    angle = (2 * np.arange(6) + 1) * math.pi / 6 + np.asarray(orientation, dtype=np.float64)[..., None]
+    vertices = np.empty(center_x.shape + (6, 2))
+    vertices[..., 0] = center_x[..., None] + radius * np.cos(angle)
+    vertices[..., 1] = center_y[..., None] + radius * np.sin(angle)
+    return vertices
@@ -0,0 +1,86 @@
+"""
+Hexagonal Lattice
+Parallel Rendering of Many Plots of a Lattice
+
+@Author: LZK
+@Date: 2023-11-20
+"""
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from .hexLattice import HexLattice
+
+_worker_lattice = None  # Lattice of the worker process, sent once by render_batch
+_RESERVED_OPTIONS = ('keys', 'save_path', 'backend')  # Given by the job itself, or always 'agg'
+
+
+def _init_worker(lattice: HexLattice) -> None:
+    global _worker_lattice
+    _worker_lattice = lattice
+
+
+def _render_job(job: tuple) -> str:
+    keys, save_path, options = _check_job(job)
+    with _worker_lattice:
+        _worker_lattice.plot(keys=keys, save_path=save_path, backend='agg', **options)
+    return save_path
+
+
+def _check_job(job: tuple) -> tuple:
+    if len(job) == 2:
+        keys, save_path = job
+        options = dict()
+    elif len(job) == 3:
+        keys, save_path, options = job
+    else:
+        raise ValueError(f"Invalid job: {job}, which should be (keys, save_path) or (keys, save_path, options)")
+    if save_path is None or save_path == '--supress':
+        raise ValueError(f"Invalid save path of job: {job}")
+    reserved = [name for name in _RESERVED_OPTIONS if name in options]
+    if reserved:
+        raise ValueError(f"Invalid options of job: {job}, where {reserved} can not be given as options")
+    return keys, save_path, dict(options)
+
+
+def render_batch(lattice: HexLattice, jobs: list, workers: int = None) -> list:
+    """
+    Render many plots of a lattice on a pool of processes
+
+    The lattice (geometry and data) is sent once to every worker, not once per job,
+    and every plot is drawn on the Agg backend, see `HexLattice.plot`.
+
+    Input
+    -----
+    lattice: HexLattice, generated lattice
+    jobs: list of tuple(keys, save_path) or tuple(keys, save_path, options),
+        where options is the dict of other arguments of `HexLattice.plot`, except 'backend' always being 'agg'
+    workers: int, number of processes, os.cpu_count() by default, or rendered in this process if 1,
+        where the lattice is copied in every case and its figure is not touched
+
+    Returns
+    -------
+    list of the save paths, in the same order as jobs
+
+    Example
+    -------
+    >>> jobs = [(f'P{i}', f'gallery/power_p{i}.png', {'color_map': 'jet', 'dpi': 600}) for i in range(4)]
+    >>> render_batch(lattice, jobs, workers=4)
+    """
+    if not lattice.lattice:
+        raise SyntaxError("Lattice has not been genderated yet.")
+    jobs = [_check_job(job) for job in jobs]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    if workers == 1:
+        # A copy, the same as the workers receive, so that the figure of the lattice is kept
+        _init_worker(pickle.loads(pickle.dumps(lattice)))
+        try:
+            return [_render_job(job) for job in jobs]
+        finally:
+            _init_worker(None)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(lattice,)) as executor:
+        return list(executor.map(_render_job, jobs))
@@ -5,6 +5,7 @@ Data Structure of Coordinates
 @Author: LZK
 @Date: 2023-5-31
 """
+import functools
 from collections import OrderedDict
 
 # Class declarations
@@ -40,10 +41,14 @@ class Coordinate:
 
 class CubeCoordinate:
 
+    __slots__ = ('_x', '_y', '_z')
+
     def __init__(self, x: int = None, y: int = None, z: int = None, value: list = None) -> None:
         """
         Data structure of the cube coordinate of hexagonal lattice
 
+        Cube coordinates are immutable and hashable, so they can be used as dict keys and set members.
+
         Input
         -----
         x: int, namely q, from bottom-left to top-right
@@ -60,6 +65,15 @@ class CubeCoordinate:
         if not self._check_value():
             raise ValueError(f"Input value is invalid: ({self._x}, {self._y}, {self._z})")
     
+    @classmethod
+    def _make(cls, x: int, y: int, z: int) -> CubeCoordinate:
+        # Build from components known to be valid ints, skipping conversion and check
+        self = object.__new__(cls)
+        self._x = x
+        self._y = y
+        self._z = z
+        return self
+    
     def _check_value(self) -> bool:
         return self._x + self._y + self._z == 0
 
@@ -77,15 +91,8 @@ class CubeCoordinate:
     
     @property
     def direction_vectors_dict(self) -> OrderedDict:
-        # Normalized vectors at six directions
-        return OrderedDict(tuple((
-            ('bottom-right', CubeCoordinate( 0, -1, +1)),
-            ('bottom-left' , CubeCoordinate(-1,  0, +1)),
-            ('left'        , CubeCoordinate(-1, +1,  0)),
-            ('top-left'    , CubeCoordinate( 0, +1, -1)),
-            ('top-right'   , CubeCoordinate(+1,  0, -1)),
-            ('right'       , CubeCoordinate(+1, -1,  0))
-        )))
+        # Normalized vectors at six directions, shared by all coordinates
+        return _DIRECTION_VECTORS
 
     def to_list(self) -> list:
         return [self._x, self._y, self._z]
@@ -96,24 +103,43 @@ class CubeCoordinate:
         return OffsetCoordinate(r=row, c=col)
     
     def to_ring(self) -> RingCoordinate:
-        r = (abs(self._x) + abs(self._y) + abs(self._z)) / 2  # Manhattan distance to the original point
+        """
+        Convert to the (ring, clock) coordinate in closed form
+
+        The ring is split into six sectors of `r` seats each, walked clockwise
+        from the corner (r, 0, -r) in the same order as `get_ring`.
+        Each sector lies on one edge of the ring, where one component equals +r or -r,
+        so the clock index is `sector * r + seat` without walking the ring.
+        """
+        x, y, z = self._x, self._y, self._z
+        r = self.distance()
 
         if r == 0:
             return RingCoordinate(r=0, k=0)
-        
-        k = 0
-        for _ in self.get_ring():
-            if _ == self:
-                break
-            k += 1
-        
+
+        if x == r and y > -r:
+            k = -y                  # Sector 0: top-right    -> right
+        elif y == -r and x > 0:
+            k = 2 * r - x           # Sector 1: right        -> bottom-right
+        elif z == r and x > -r:
+            k = 2 * r - x           # Sector 2: bottom-right -> bottom-left
+        elif x == -r and y < r:
+            k = 3 * r + y           # Sector 3: bottom-left  -> left
+        else:
+            k = 5 * r + x           # Sector 4 & 5: left -> top-left -> top-right
+
         return RingCoordinate(r=r, k=k)
     
+    def distance(self, other: CubeCoordinate = None) -> int:
+        """
+        Get the hex distance (number of steps between neighbours) to another coordinate, or to the original point
+        """
+        if other is None:
+            return (abs(self._x) + abs(self._y) + abs(self._z)) // 2
+        return (abs(self._x - other._x) + abs(self._y - other._y) + abs(self._z - other._z)) // 2
+
     def get_all_neighbours(self) -> list:
-        res = list()
-        for directon_vector in self.direction_vectors_dict.values():
-            res.append(self + directon_vector)
-        return res
+        return [self + directon_vector for directon_vector in _DIRECTION_VECTORS.values()]
     
     def get_neighbour(self, direction: CubeCoordinate or list or str) -> CubeCoordinate:
         """
@@ -136,15 +162,10 @@ class CubeCoordinate:
         if type(direction) is list:
             direction = CubeCoordinate(value=direction).normalize()
         elif type(direction) is str:
-            direction = self.direction_vectors_dict[direction]
+            direction = _DIRECTION_VECTORS[direction]
         
         # Check direction
-        is_valid = False
-        for standard_direction in self.direction_vectors_dict.values():
-            if direction == standard_direction:
-                is_valid = True
-                break
-        if not is_valid:
+        if direction not in _DIRECTION_VECTOR_SET:
             raise ValueError(f"{direction} is not a valid direction vector.")
 
         return self + direction
@@ -161,36 +182,46 @@ class CubeCoordinate:
           4  3
         ```
         """
-        ring = int((abs(self._x) + abs(self._y) + abs(self._z)) / 2)  # Manhattan distance to the original point
-        
+        ring = self.distance()
+
         if ring == 0:
             return [self]
-        
-        next_ = ring * self.direction_vectors_dict['top-right']
-        direction_vectors_list = list(self.direction_vectors_dict.values())
 
-        res = list()
-        for i in range(0, 6):
-            for k in range(0, ring):
-                res.append(next_)
-                next_ = next_.get_neighbour(direction=direction_vectors_list[i])
+        # Small rings are built from their cached components, larger ones are computed every time
+        components = _ring_template(ring) if ring <= _RING_TEMPLATE_MAX else _iter_ring_components(ring)
+        return [CubeCoordinate._make(x, y, z) for x, y, z in components]
 
-        return res
+    def iter_ring(self):
+        """
+        Iterate over the coordinates at given ring, in the same order as `get_ring`, without building the list
+        """
+        ring = self.distance()
+        
+        if ring == 0:
+            yield self
+            return
+        
+        for x, y, z in _iter_ring_components(ring):
+            yield CubeCoordinate._make(x, y, z)
 
     def __str__(self) -> str:
         return f"CubeCoordinate({self._x}, {self._y}, {self._z})"
     
     def __eq__(self, other: CubeCoordinate) -> bool:
-        if self._x != other.x: return False
-        if self._y != other.y: return False
-        if self._z != other.z: return False
+        if not isinstance(other, CubeCoordinate): return NotImplemented
+        if self._x != other._x: return False
+        if self._y != other._y: return False
+        if self._z != other._z: return False
         return True
+
+    def __hash__(self) -> int:
+        return hash((self._x, self._y, self._z))
     
     def __add__(self, other: CubeCoordinate) -> CubeCoordinate:
-        return CubeCoordinate(
-            x = self._x + other.x,
-            y = self._y + other.y,
-            z = self._z + other.z
+        return CubeCoordinate._make(
+            x = self._x + other._x,
+            y = self._y + other._y,
+            z = self._z + other._z
         )
     
     def __rmul__(self, factor: int) -> CubeCoordinate:
@@ -208,8 +239,51 @@ class CubeCoordinate:
         )
 
 
+# Normalized vectors at six directions
+_DIRECTION_VECTORS = OrderedDict(tuple((
+    ('bottom-right', CubeCoordinate( 0, -1, +1)),
+    ('bottom-left' , CubeCoordinate(-1,  0, +1)),
+    ('left'        , CubeCoordinate(-1, +1,  0)),
+    ('top-left'    , CubeCoordinate( 0, +1, -1)),
+    ('top-right'   , CubeCoordinate(+1,  0, -1)),
+    ('right'       , CubeCoordinate(+1, -1,  0))
+)))
+_DIRECTION_VECTOR_SET = frozenset(_DIRECTION_VECTORS.values())
+
+
+_RING_TEMPLATE_MAX = 32  # Largest ring whose components are cached by _ring_template
+
+
+def _iter_ring_components(ring: int):
+    """
+    Iterate over the components (x, y, z) of the coordinates at given ring in the order of `CubeCoordinate.get_ring`
+
+    Each of the six sectors starts from its corner and walks along one direction (see `CubeCoordinate.to_ring`).
+    """
+    r = ring
+    corners_steps = (
+        (( r,  0, -r), ( 0, -1, +1)),
+        (( r, -r,  0), (-1,  0, +1)),
+        (( 0, -r,  r), (-1, +1,  0)),
+        ((-r,  0,  r), ( 0, +1, -1)),
+        ((-r,  r,  0), (+1,  0, -1)),
+        (( 0,  r, -r), (+1, -1,  0)),
+    )
+    for (cx, cy, cz), (sx, sy, sz) in corners_steps:
+        for seat in range(r):
+            yield cx + seat * sx, cy + seat * sy, cz + seat * sz
+
+
+@functools.lru_cache(maxsize=_RING_TEMPLATE_MAX)
+def _ring_template(ring: int) -> tuple:
+    # Components of a small ring, computed once for `CubeCoordinate.get_ring`
+    return tuple(_iter_ring_components(ring))
+
+
 class OffsetCoordinate:
 
+    __slots__ = ('_r', '_c')
+
     def __init__(self, r: int = None, c: int = None, value: list = None) -> None:
         """
         Data structure of the offset coordinate
@@ -243,9 +317,18 @@ class OffsetCoordinate:
     def __str__(self) -> str:
         return f"OffsetCoordinate({self._r}, {self._c})"
 
+    def __eq__(self, other: OffsetCoordinate) -> bool:
+        if not isinstance(other, OffsetCoordinate): return NotImplemented
+        return self._r == other._r and self._c == other._c
+
+    def __hash__(self) -> int:
+        return hash((self._r, self._c))
+
 
 class RingCoordinate:
 
+    __slots__ = ('_r', '_k')
+
     def __init__(self, r: int = None, k: int = None, value: list = None) -> None:
         if value:
             self._r, self._k = list(map(int, value))
@@ -262,20 +345,43 @@ class RingCoordinate:
         return self._k
     
     def to_cube(self) -> CubeCoordinate:
-        start_point = CubeCoordinate(
-            x = +self._r,
-            y = 0,
-            z = -self._r
-        )
-        for cube_coor in start_point.get_ring():
-            ring_coor = cube_coor.to_ring()
-            if self == ring_coor:
-                return cube_coor
+        """
+        Convert to the cube coordinate in closed form
+
+        The clock index is split into the sector `k // r` and the seat `k % r`,
+        and the seat is walked from the corner of the sector (see `CubeCoordinate.to_ring`).
+        """
+        r, k = self._r, self._k
+
+        if r == 0:
+            if k != 0:
+                raise ValueError(f"{self} is out of range.")
+            return CubeCoordinate(x=0, y=0, z=0)
+        if r < 0 or not 0 <= k < 6 * r:
+            raise ValueError(f"{self} is out of range.")
+
+        sector, seat = divmod(k, r)
+        if sector == 0:
+            return CubeCoordinate(x=r, y=-seat, z=seat-r)
+        elif sector == 1:
+            return CubeCoordinate(x=r-seat, y=-r, z=seat)
+        elif sector == 2:
+            return CubeCoordinate(x=-seat, y=seat-r, z=r)
+        elif sector == 3:
+            return CubeCoordinate(x=-r, y=seat, z=r-seat)
+        elif sector == 4:
+            return CubeCoordinate(x=seat-r, y=r, z=-seat)
+        else:
+            return CubeCoordinate(x=seat, y=r-seat, z=-r)
 
     def __str__(self) -> str:
         return f"RingCoordinate({self._r}, {self._k})"
 
     def __eq__(self, other: RingCoordinate) -> bool:
-        if self._r != other.r: return False
-        if self._k != other.k: return False
+        if not isinstance(other, RingCoordinate): return NotImplemented
+        if self._r != other._r: return False
+        if self._k != other._k: return False
         return True
+
+    def __hash__(self) -> int:
+        return hash((self._r, self._k))
@@ -6,13 +6,170 @@ Data Structure of Hexagonal Lattice
 @Date: 2023-5-31
 """
 import os
+import contextlib
 from os import PathLike
+from types import SimpleNamespace
 from typing import Any
 
 from .coordinates import *
+from .batchCoordinates import *
+from .latticeData import *
 import math
+import numbers
+import numpy as np
 # import matplotlib.pyplot as plt
 from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+
+def _format_values(values: np.ndarray, data_fmt: str = 'default') -> np.ndarray:
+    """
+    Format the values of cells as text, None (NaN) as empty text
+
+    data_fmt: '%', 'f' or 'e' for all floats, otherwise 'default' chooses by magnitude
+    """
+    if values.dtype.kind == 'f':
+        values = values.astype(np.float64)
+        text = np.empty(values.size, dtype=object)
+        finite = ~np.isnan(values)
+        if data_fmt == '%':
+            text[finite] = np.char.mod('%.2f%%', 100. * values[finite])
+        elif data_fmt in ('F', 'f'):
+            text[finite] = np.char.mod('%.2f', values[finite])
+        elif data_fmt in ('E', 'e'):
+            text[finite] = np.char.mod('%.2E', values[finite])
+        else:
+            magnitude = np.abs(values[finite])
+            text[finite] = np.where(
+                (magnitude >= 100.) | ((magnitude <= 1E-2) & (magnitude > 1E-15)),
+                np.char.mod('%.2E', values[finite]),
+                np.char.mod('%.2f', values[finite])
+            )
+        text[~finite] = ''
+        return text
+    if values.dtype.kind in 'iub':
+        return values.astype(np.int64).astype(str).astype(object)
+
+    # Mixed types, formatted one by one
+    text = np.empty(values.size, dtype=object)
+    for i, value in enumerate(values.tolist()):
+        if value is None or (isinstance(value, float) and value != value):
+            text[i] = ''
+        elif isinstance(value, float):
+            text[i] = _format_values(np.array([value]), data_fmt)[0]
+        elif not isinstance(value, str):
+            text[i] = str(round(value, 2))
+        else:
+            text[i] = value
+    return text
+
+
+FIGURE_BACKENDS = ('pyplot', 'agg')
+FIGURE_POLICIES = ('close', 'reuse', 'keep')
+REDUCE_OPS = ('sum', 'mean', 'max', 'min', 'count')  # Operations of HexLattice.reduce_data
+SYMMETRIES = (1, 3, 6, 12)  # Full, 1/3, 1/6 and 1/12 (with reflection) core, see HexLattice.generate_symmetry_index
+
+# Matplotlib is imported on the first plot and kept here, so that importing the package does not load it
+_matplotlib = None
+_pyplot = None
+
+
+def _import_matplotlib() -> SimpleNamespace:
+    """
+    Import the parts of Matplotlib used for plotting, once for all plots
+
+    Returns
+    -------
+    SimpleNamespace of matplotlib and its classes, e.g. `_import_matplotlib().LineCollection`
+    """
+    global _matplotlib
+    if _matplotlib is None:
+        try:
+            import matplotlib
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.collections import EllipseCollection, LineCollection, PolyCollection
+            from matplotlib.colors import Normalize, TABLEAU_COLORS
+            from matplotlib.figure import Figure
+            from matplotlib.font_manager import FontProperties
+        except ImportError:
+            raise ImportError("Matplotlib could not be imported.")
+        _matplotlib = SimpleNamespace(
+            matplotlib = matplotlib,
+            FigureCanvasAgg = FigureCanvasAgg,
+            EllipseCollection = EllipseCollection,
+            LineCollection = LineCollection,
+            PolyCollection = PolyCollection,
+            Normalize = Normalize,
+            TABLEAU_COLORS = TABLEAU_COLORS,
+            Figure = Figure,
+            FontProperties = FontProperties
+        )
+    return _matplotlib
+
+
+def _import_pyplot():
+    # Pyplot sets up a GUI backend, so it is imported only if a figure is managed by pyplot
+    global _pyplot
+    if _pyplot is None:
+        try:
+            import matplotlib.pyplot as plt
+        except ImportError:
+            raise ImportError("Matplotlib.pyplot could not be imported.")
+        _pyplot = plt
+    return _pyplot
+
+
+def _new_figure(figsize: tuple, dpi: float, backend: str = 'pyplot') -> tuple:
+    """
+    Create a figure with one axes, managed by pyplot or as a bare Figure on the Agg canvas
+
+    Returns
+    -------
+    tuple(figure, axes)
+    """
+    if backend == 'pyplot':
+        return _import_pyplot().subplots(figsize=figsize, dpi=dpi)
+    elif backend == 'agg':
+        mpl = _import_matplotlib()
+        figure = mpl.Figure(figsize=figsize, dpi=dpi)
+        mpl.FigureCanvasAgg(figure)
+        return figure, figure.add_subplot()
+    raise ValueError(f"Invalid figure backend: {backend}, which should be in {FIGURE_BACKENDS}")
+
+
+def _close_figure(figure) -> None:
+    # Only a figure created by pyplot is registered to be closed
+    if figure is not None and getattr(figure.canvas, 'manager', None) is not None:
+        _import_pyplot().close(figure)
+
+
+def _rc_context(backend: str = 'pyplot', rc: dict = None):
+    # Changes of rcParams are global for pyplot, and restored afterwards for the other backends
+    matplotlib = _import_matplotlib().matplotlib
+    if backend == 'pyplot':
+        matplotlib.rcParams.update(rc or dict())
+        return contextlib.nullcontext()
+    return matplotlib.rc_context(rc)
+
+
+def _save_figure(figure, save_path: PathLike) -> None:
+    """
+    Show the figure if save_path is None, do nothing if '--supress', or else save it
+    """
+    if save_path is None:
+        if getattr(figure.canvas, 'manager', None) is None:
+            raise ValueError("Figure not created by pyplot can not be shown, please give save_path.")
+        _import_pyplot().show()
+    elif save_path == '--supress':
+        pass
+    else:
+        if not os.path.exists(save_path):
+            save_path = os.path.join(os.getcwd(), save_path)
+        dir_path = os.path.dirname(save_path)
+        if not os.path.exists(dir_path):
+            os.mkdir(dir_path)
+
+        figure.savefig(save_path, transparent=True)
+
 
 class HexCell:
 
@@ -34,18 +191,32 @@ class HexCell:
         self._pitch = pitch
         self._value = dict()
         self._orientation = orientation
+
+        # Geometry computed on first access, invalidated when pitch or orientation changes
+        self._central_point = None
+        self._surround_points = None
     
     @property
     def central_point(self) -> tuple:
+        if self._central_point is None:
+            self._central_point = self._compute_central_point()
+        return self._central_point
+    
+    @property
+    def surround_points(self) -> tuple:
+        if self._surround_points is None:
+            self._surround_points = self._compute_surround_points()
+        return self._surround_points
+
+    def _compute_central_point(self) -> tuple:
         position_ring_coor = self._position.to_ring()
         return self.rk2xy(
             r = position_ring_coor.r,
             k = position_ring_coor.k if position_ring_coor.k > 0 else 6 * position_ring_coor.r,
             pitch=self._pitch
         )
-    
-    @property
-    def surround_points(self) -> tuple:
+
+    def _compute_surround_points(self) -> tuple:
         central_point = self.central_point
         vertex_half_distance = self._pitch / math.sqrt(3)  # Distance between two farest vertex points
         res = list()
@@ -54,7 +225,7 @@ class HexCell:
             x = central_point[0] + vertex_half_distance * math.cos(angle)
             y = central_point[1] + vertex_half_distance * math.sin(angle)
             res.append((x, y))
-        return res
+        return tuple(res)
 
     def rk2xy(self, r: int, k: int, pitch: float = 1.0) -> tuple:
         """
@@ -66,9 +237,10 @@ class HexCell:
         k: int, the clock coordinate
         pitch: float, the pitch of core lattice
         """
-        # Check input
-        if type(r) is not int or type(k) is not int:
+        # Check input (NumPy integers are accepted), use `ring_to_xy` for arrays
+        if not isinstance(r, numbers.Integral) or not isinstance(k, numbers.Integral):
             raise TypeError("Input coordinate is not type int.")
+        r, k = int(r), int(k)
         
         # Handle the innest ring (single assembly)
         if r == 0:
@@ -104,6 +276,12 @@ class HexCell:
     @property
     def pitch(self) -> float:
         return self._pitch
+
+    @pitch.setter
+    def pitch(self, value):
+        self._pitch = value
+        self._central_point = None
+        self._surround_points = None
     
     @property
     def coordinate(self) -> tuple:
@@ -121,6 +299,7 @@ class HexCell:
     @orientation.setter
     def orientation(self, value):
         self._orientation = value
+        self._surround_points = None
     
     def __setitem__(self, key, value):
         self._value[key] = value
@@ -129,25 +308,409 @@ class HexCell:
         return self._value[key]
 
 
+class _LatticeCell(HexCell):
+
+    def __init__(self, lattice: 'HexLattice', index: int) -> None:
+        """
+        Cell of a generated HexLattice, reading its geometry from the lattice arrays
+
+        Input
+        -----
+        lattice: HexLattice, the lattice owning the cell
+        index: int, the flat (ring-ordered) index of the cell in lattice
+        """
+        super().__init__(positon=None, pitch=lattice.pitch)
+        self._lattice = lattice
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def position(self) -> CubeCoordinate:
+        if self._position is None:
+            arrays = self._lattice.arrays
+            self._position = CubeCoordinate(
+                x = arrays['x'][self._index],
+                y = arrays['y'][self._index],
+                z = arrays['z'][self._index]
+            )
+        return self._position
+
+    def _compute_central_point(self) -> tuple:
+        arrays = self._lattice.arrays
+        return float(arrays['center_x'][self._index]), float(arrays['center_y'][self._index])
+
+    @property
+    def coordinate(self) -> tuple:
+        arrays = self._lattice.arrays
+        return int(arrays['r'][self._index]), int(arrays['k'][self._index])
+
+    @property
+    def value(self) -> dict:
+        data = self._lattice.data
+        return {key: data.get(key, self._index) for key in data.keys() if data.has(key, self._index)}
+
+    def __setitem__(self, key, value):
+        # Stored in the columns of lattice data, a non-dict value is taken as the 'value' field
+        if isinstance(value, Mapping):
+            self._lattice.data.set(key, self._index, **value)
+        else:
+            self._lattice.data.set(key, self._index, value=value)
+
+    def __getitem__(self, key) -> CellData:
+        return self._lattice.data.get(key, self._index)
+
+    def __str__(self) -> str:
+        return f"HexCell({self.position})"
+
+
+class _LatticeRing(Sequence):
+
+    def __init__(self, lattice: 'HexLattice', ring: int) -> None:
+        """
+        Read-only view of one ring of a generated HexLattice
+
+        The cells are created on first access and kept, so that data stored in them persists.
+        """
+        self._lattice = lattice
+        self._ring = ring
+        self._start = 3 * ring * (ring - 1) + 1 if ring > 0 else 0
+        self._size = 6 * ring if ring > 0 else 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(self._size))]
+        if k < 0:
+            k += self._size
+        if not 0 <= k < self._size:
+            raise IndexError(f"Clock index {k} out of range of ring {self._ring}.")
+        return self._lattice._get_cell(self._start + k)
+
+    def __str__(self) -> str:
+        return f"HexRing({self._ring})"
+
+
 class HexLattice:
 
     def __init__(self, ring: int, pitch: float) -> None:
         self._ring = ring
         self._pitch = pitch
         self._lattice = list()
+        self._arrays = dict()  # Struct-of-arrays of cell geometry, created in HexLattice.generate_lattice()
+        self._cells = list()   # Cells created on demand by HexLattice._get_cell()
+        self._ring_axial_index = None  # Cached by HexLattice.generate_ring_axial_index()
+        self._neighbour_index = dict() # Cached by HexLattice.generate_neighbour_index(), of each order
+        self._position_index = None    # Cached by HexLattice.generate_position_index()
+        self._reductions = dict()      # Cached by HexLattice.reduce_data(), until the data of key changes
+        self._symmetry_index = dict()  # Cached by HexLattice.generate_symmetry_index(), of each symmetry
+        self._data = LatticeData(cell_num=self.cell_num)  # Columns of data of every key, in ring order
         self._figure = None # Matplotlib.figure, created in HexLattice.plot()
         self._axes = None
     
     def generate_lattice(self) -> list:
-        for r in range(self._ring):
-            start_point = CubeCoordinate(x=+r, y=0, z=-r)
-            ring_points = list()
-            for point_k in start_point.get_ring():
-                cell_k = HexCell(positon=point_k, pitch=self._pitch)
-                ring_points.append(cell_k)
-            self._lattice.append(ring_points)
-        
+        """
+        Generate the cell geometry of the lattice in vectorized form
+
+        The cells are stored ring-by-ring (flat index `3r(r-1) + 1 + k`) as arrays of
+        - int32 'x', 'y', 'z': cube coordinate
+        - int32 'r', 'k': ring coordinate
+        - int32 'row', 'col': axial coordinate (see `generate_ring_axial_hash`)
+        - float64 'center_x', 'center_y': central point of cell
+
+        The lattice is generated once, and later calls return it unchanged, keeping its cells.
+
+        Returns
+        -------
+        list of rings, where `lattice[r][k]` is a HexCell view over the arrays
+        """
+        if self._lattice:
+            return self._lattice
+
+        r, k = ring_coordinates(self._ring)
+        x, y, z = ring_to_cube(r, k)
+        row, col = cube_to_axial(x, y, z, ring=self._ring)
+        center_x, center_y = cube_to_xy(x, y, z, pitch=self._pitch)
+
+        self._arrays = {
+            'x'       : x,
+            'y'       : y,
+            'z'       : z,
+            'r'       : r,
+            'k'       : k,
+            'row'     : row,
+            'col'     : col,
+            'center_x': center_x,
+            'center_y': center_y,
+        }
+        for array in self._arrays.values():
+            array.flags.writeable = False
+
+        self._cells = [None] * self.cell_num
+        self._lattice = [_LatticeRing(lattice=self, ring=r) for r in range(self._ring)]
+
         return self._lattice
+
+    def iter_rings(self):
+        """
+        Iterate over the rings from the center, each as a sequence of cells
+
+        Rings of a generated lattice are its own views, otherwise they are built one at a time
+        from coordinates, so that the lattice is never materialised.
+        """
+        if self._lattice:
+            yield from self._lattice
+            return
+        for r in range(self._ring):
+            yield tuple(self._iter_ring_cells(r))
+
+    def iter_cells(self):
+        """
+        Iterate over all cells ring-by-ring, in constant memory if the lattice is not generated
+
+        Example
+        -------
+        >>> lattice = HexLattice(ring=60, pitch=1.0)
+        >>> max(cell.central_point[0] for cell in lattice.iter_cells())
+        """
+        if self._lattice:
+            for index in range(self.cell_num):
+                yield self._get_cell(index)
+            return
+        for r in range(self._ring):
+            yield from self._iter_ring_cells(r)
+
+    def _iter_ring_cells(self, ring: int):
+        corner = ring * CubeCoordinate(x=+1, y=0, z=-1) if ring > 0 else CubeCoordinate(x=0, y=0, z=0)
+        for position in corner.iter_ring():
+            yield HexCell(positon=position, pitch=self._pitch)
+
+    def set_data(
+            self,
+            key          : str,
+            value        : Any                 = None,
+            order        : str                 = 'axial',   # 'axial': row-by-row, 'ring': ring-by-ring
+            cell_shape   : Any                 = 'hex',     # 'hex': hexagonal, 'circ': circular
+            cell_radius  : Any                 = 0.,        # The radius of circle if cell_shape = 'circ'
+            offset       : Any                 = (0, 0),    # Offset from the cell center
+            zorder       : Any                 = 1,         # Plot layor priority, same as matplotlib
+            color        : Any                 = None,
+            orientation  : Any                 = 0.,
+            symmetry     : int                 = 1          # 1: full core, 3, 6 or 12: 1/3, 1/6 or 1/12 core
+        ) -> None:
+        """
+        Assign data of a key to all cells at once
+
+        Every argument except `key`, `order` and `symmetry` is either a scalar shared by all cells,
+        or an array (list, np.ndarray, pd.Series, ...) with one item per cell in the given order.
+        This replaces calling `RowAppender.append` once per cell.
+
+        With `symmetry`, arrays have one item per cell of the fundamental domain (see `generate_symmetry_index`)
+        in the given order, and only these items are stored, shared by the equivalent cells of the full core.
+
+        Example
+        -------
+        ```python
+        >>> lattice.set_data(key='P0', value=power[:, 0])            # Row-by-row, as RowAppender
+        >>> lattice.set_data(key='id', value=np.arange(lattice.cell_num), order='ring')
+        >>> lattice.set_data(key='P1', value=sixth_power, symmetry=6)  # Row-by-row over the 1/6 core
+        ```
+        """
+        if order not in ('axial', 'ring'):
+            raise ValueError(f"Invalid order: {order}")
+        if symmetry not in SYMMETRIES:
+            raise ValueError(f"Invalid symmetry: {symmetry}, which should be one of {SYMMETRIES}")
+
+        unfold = None
+        if symmetry == 1:
+            permutation = self.generate_ring_axial_index()[0] if order == 'axial' else None
+        else:
+            fundamental, unfold = self.generate_symmetry_index(symmetry)
+            # Rank of every fundamental cell in row-by-row order
+            permutation = np.argsort(np.argsort(self.generate_ring_axial_index()[0][fundamental])) \
+                if order == 'axial' else None
+
+        self._data.assign(
+            key,
+            permutation = permutation,
+            unfold      = unfold,
+            value       = value,
+            shape       = cell_shape,
+            radius      = cell_radius,
+            offset      = offset,
+            zorder      = zorder,
+            color       = color,
+            orientation = orientation
+        )
+
+    @property
+    def data(self) -> LatticeData:
+        return self._data
+
+    def fold_data(self, keys: str or list, symmetry: int = 6, relative: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Fold the full-core values of keys into the fundamental domain, and measure the breaking of symmetry
+
+        Every fundamental cell takes the mean over its orbit (see `generate_symmetry_orbits`),
+        and the largest deviation of the cells in the orbit from this mean. Cells without data or with None values
+        are left out, and an orbit without values gives NaN.
+
+        Input
+        -----
+        keys: str or list of str, the keys of numeric data, joined by '&' as in `plot`
+        symmetry: int, one of SYMMETRIES
+        relative: bool, whether deviations are divided by the absolute mean (NaN for zero mean)
+
+        Returns
+        -------
+        tuple(mean: np.ndarray, deviation: np.ndarray) of float64 of shape (number of keys, number of fundamental cells),
+        ring-by-ring over the fundamental cells as `set_data(..., order='ring', symmetry=symmetry)`,
+        and `deviation[:, unfold]` gives the deviation of every cell of the full core
+
+        Example
+        -------
+        ```python
+        >>> mean, deviation = lattice.fold_data('P0&P1&P2&P3', symmetry=6, relative=True)
+        >>> print(deviation.max(axis=1))       # Largest asymmetry of every key
+        >>> lattice.set_data(key='P0_folded', value=mean[0], order='ring', symmetry=6)
+        ```
+        """
+        keys = keys.split('&') if isinstance(keys, str) else list(keys)
+        orbits = self.generate_symmetry_orbits(symmetry)
+
+        values = np.empty((len(keys), self.cell_num))
+        for i, key in enumerate(keys):
+            if key not in self._data:
+                raise KeyError(key)
+            values[i] = self._get_numeric_values(key)
+
+        # Values of every orbit, of shape (keys, symmetry, fundamental cells), reduced over long rows of cells
+        orbit_values = values.take(orbits.T, axis=1)
+        valid = ~np.isnan(orbit_values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, orbit_values, 0.).sum(axis=1) / valid.sum(axis=1)
+            # The largest deviation is at either end of the orbit, where NaN is ignored by fmax and fmin
+            deviation = np.fmax(np.fmax.reduce(orbit_values, axis=1) - mean, mean - np.fmin.reduce(orbit_values, axis=1))
+            if relative:
+                deviation = np.where(mean != 0., deviation / np.abs(mean), np.nan)
+        return mean, deviation
+
+    def get_data(self, key: str, field: str = 'value', order: str = 'axial') -> np.ndarray:
+        """
+        Get a field of the data of a key in all cells, unfolded to the full core if stored with symmetry
+
+        Input
+        -----
+        key: str, the key of data
+        field: str, 'mask' (whether the cell has data) or one of FIELD_DEFAULTS
+        order: str, 'axial' for row-by-row, the same as `set_data`, or 'ring' for ring-by-ring
+
+        Returns
+        -------
+        np.ndarray of one item per cell, where the field 'mask' tells the cells with data
+        """
+        if key not in self._data:
+            raise KeyError(key)
+        if field not in FIELD_DEFAULTS and field != 'mask':
+            raise ValueError(f"Invalid field: {field}")
+        if order == 'axial':
+            index = self.generate_ring_axial_index()[1]
+        elif order == 'ring':
+            index = np.arange(self.cell_num)
+        else:
+            raise ValueError(f"Invalid order: {order}")
+
+        key_data = self._data[key]
+        if field == 'color':
+            return key_data.colors[index]
+        if field == 'shape':
+            return np.array(CELL_SHAPES, dtype=object)[key_data.take('shape', index)]
+        return key_data.take(field, index)
+
+    def reduce_data(self, key: str, by: str = 'ring', op: str = 'mean') -> np.ndarray:
+        """
+        Reduce the numeric values of a key over each ring or each sector, computed once and cached
+
+        Cells without data or with None values are left out.
+        The results are kept until the data of key is set again (by `set_data`, `RowAppender` or cells).
+
+        Input
+        -----
+        key: str, the key of data
+        by: str, 'ring' for rings 0 to ring-1, or 'sector' for the six sectors `k // r` (see `CubeCoordinate.to_ring`),
+            where the central cell belongs to no sector
+        op: str, one of REDUCE_OPS, 'sum', 'mean', 'max', 'min' or 'count'
+
+        Returns
+        -------
+        np.ndarray of shape (ring,) or (6,), read-only, of int64 for 'count' or else float64,
+        where a group without values gives NaN (0 for 'sum' and 'count')
+
+        Example
+        -------
+        ```python
+        >>> ring_power = lattice.reduce_data('power', by='ring', op='mean')
+        >>> peaking = lattice.reduce_data('power', by='sector', op='max') / lattice.reduce_data('power', by='sector')
+        ```
+        """
+        if by not in ('ring', 'sector'):
+            raise ValueError(f"Invalid group: {by}, which should be 'ring' or 'sector'")
+        if op not in REDUCE_OPS:
+            raise ValueError(f"Invalid operation: {op}, which should be one of {REDUCE_OPS}")
+        if key not in self._data:
+            raise KeyError(key)
+
+        key_data = self._data[key]
+        cached = self._reductions.get((key, by, op))
+        if cached is not None and cached[0] is key_data and cached[1] == key_data.version:
+            return cached[2]
+
+        values = self._get_numeric_values(key)
+        valid = ~np.isnan(values)
+
+        # Cells are stored ring-by-ring and sector-by-sector, so that every group is a contiguous block
+        if by == 'ring':
+            start = ring_to_index(np.arange(self._ring), 0)
+        else:
+            r = np.repeat(np.arange(1, max(self._ring, 2)), 6)
+            start = ring_to_index(r, np.tile(np.arange(6), r.size // 6) * r)
+            if self._ring == 1:
+                values, valid, start = np.full(6, np.nan), np.zeros(6, dtype=np.bool_), np.arange(6)  # Six empty sectors
+        if op in ('sum', 'mean', 'count'):
+            count = np.add.reduceat(valid.astype(np.int64), start)
+            total = np.add.reduceat(np.where(valid, values, 0.), start)
+            if by == 'sector':
+                # Sum the blocks of all rings into sectors
+                count = np.bincount(np.arange(count.size) % 6, weights=count, minlength=6).astype(np.int64)
+                total = np.bincount(np.arange(total.size) % 6, weights=total, minlength=6)
+            if op == 'count':
+                result = count
+            elif op == 'sum':
+                result = total
+            else:
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    result = np.where(count > 0, total / count, np.nan)
+        else:
+            # NaN is ignored by fmax and fmin, unless a whole group is NaN
+            ufunc = np.fmax if op == 'max' else np.fmin
+            result = ufunc.reduceat(np.where(valid, values, np.nan), start)
+            if by == 'sector':
+                result = ufunc.reduce(result.reshape(-1, 6), axis=0)
+
+        result.flags.writeable = False
+        self._reductions[(key, by, op)] = (key_data, key_data.version, result)
+        return result
+
+    def _get_cell(self, index: int) -> HexCell:
+        cell = self._cells[index]
+        if cell is None:
+            cell = _LatticeCell(lattice=self, index=index)
+            self._cells[index] = cell
+        return cell
     
     def plot(
             self,
@@ -163,27 +726,46 @@ class HexLattice:
             colorbar_format: str      = "{x:.2f}",
             **kwargs
         ):
+        """
+        Plot the data of keys in lattice
+
+        The figure is kept in the lattice, see `get_matplotlib_figure`, and its lifecycle is given by kwargs
+        backend: 'pyplot' by default, or 'agg' to draw a bare matplotlib Figure on the Agg canvas,
+            without registering it in pyplot or changing the global rcParams
+        figure_policy: 'close' by default to close the previous figure of lattice, 'reuse' to clear and redraw it,
+            or 'keep' to leave it open
+        """
         if not self._lattice:
             raise SyntaxError("Lattice has not been genderated yet.")
-        
-        try:
-            import matplotlib.pyplot as plt
-            plt.rc('font', family='Times New Roman')
-        except ImportError:
-            raise ImportError("Matplotlib could not be imported.")
-        
-        # if color_map:
-        try:
-            import numpy as np
-            from matplotlib.patches import Polygon, Circle
-            from matplotlib.collections import PatchCollection
-            from matplotlib.colors import TABLEAU_COLORS
-        except ImportError:
-            raise ImportError("Numpy or Matplotlib.[patches,collections] could not be imported.")
-        patches = list()
-        colors = list()
-        # color = None
-        has_color = False
+
+        backend = kwargs.pop('backend', 'pyplot')
+        figure_policy = kwargs.pop('figure_policy', 'close')
+        if figure_policy not in FIGURE_POLICIES:
+            raise ValueError(f"Invalid figure policy: {figure_policy}, which should be in {FIGURE_POLICIES}")
+        with _rc_context(backend, {'font.family': 'Times New Roman'}):
+            figsize = kwargs.pop('figsize', (4, 4))
+            dpi = kwargs.pop('dpi', 400)
+            if figure_policy == 'reuse' and self._figure is not None:
+                self._figure.clear()
+                self._figure.set_size_inches(figsize)
+                self._figure.set_dpi(dpi)
+                self._axes = self._figure.add_subplot()
+            else:
+                if figure_policy == 'close':
+                    self.close()
+                self._figure, self._axes = _new_figure(figsize=figsize, dpi=dpi, backend=backend)
+
+            self._plot(
+                keys, text_size, save_path, color_map, offset_factor, max_ring_idx,
+                show_wireframe, show_colorbar, show_axis, colorbar_format, dpi, **kwargs
+            )
+
+    def _plot(
+            self,
+            keys, text_size, save_path, color_map, offset_factor, max_ring_idx,
+            show_wireframe, show_colorbar, show_axis, colorbar_format, dpi, **kwargs
+        ):
+        mpl = _import_matplotlib()
 
         if max_ring_idx < 0:
             max_ring_idx = self._ring
@@ -193,199 +775,262 @@ class HexLattice:
         else:
             linewidth = 1
 
-        if 'figsize' in kwargs:
-            figsize = kwargs['figsize']
-        else:
-            figsize = (4, 4)
-        if 'dpi' in kwargs:
-            dpi = kwargs['dpi']
-        else:
-            dpi = 400
-        self._figure, self._axes = plt.subplots(figsize=figsize, dpi=dpi)
-
         data_fmt : str = 'default'
         if 'data_fmt' in kwargs:
             data_fmt = kwargs['data_fmt']
 
-        for ring_idx, ring in enumerate(self._lattice):
-            if ring_idx >= max_ring_idx: continue
-            for cell_idx, cell in enumerate(ring):
-                # plt.scatter(*cell.central_point, c='k')
-                text_x = cell.central_point[0] - cell.pitch * offset_factor
-                text_y = cell.central_point[1]
-                r, k = cell.coordinate
-
-                for key in keys.split('&'):
-
-                    # The text value to be showed
-                    if key == 'position':
-                        text_to_print = "Cell({:d},{:d})".format(r, k)
-                        color = None
-                    elif key == 'position-brief':
-                        text_to_print = "({:d},{:d})".format(r, k)
-                        color = None
-                    else:
-                        try:
-                            cell_info   = self._lattice[r][k][key]
-                            value       = cell_info['value']
-                            cell_shape  = cell_info['shape']
-                            cell_radius = cell_info['radius']
-                            offset      = cell_info['offset']
-                            zorder      = cell_info['zorder']
-                            color       = cell_info['color']
-                            orientation = cell_info['orientation']
-                        except KeyError:
-                            print("Key not found: self._lattice[{}][{}][{}]".format(r, k, key))
-                            continue
-                            # raise KeyError("self._lattice[{}][{}][{}]".format(r, k, key))
-                        
-                        if value is None:
-                            text_to_print = ''
-                        elif isinstance(value, float):
-                            if data_fmt == '%':
-                                text_to_print = "{:.2%}".format(value)
-                            elif data_fmt in ('F', 'f'):
-                                text_to_print = "{:.2f}".format(value)
-                            elif data_fmt in ('E', 'e'):
-                                text_to_print = "{:.2E}".format(value)
-                            else:
-                                if abs(value) >= 100. or (abs(value) <= 1E-2 and abs(value) > 1E-15):
-                                    text_to_print = "{:.2E}".format(value)
-                                else:
-                                    text_to_print = "{:.2f}".format(value)
-                        elif not isinstance(value, str):
-                            text_to_print = str(round(value, 2))
-                        else:
-                            text_to_print = value
-
-                    surround_points = cell.surround_points
-                    start_point = surround_points[-1]
-
-                    # Prepare the fillment of cell
-                    if color_map or color:
-                        if cell_shape == 'hex':
-                            if not cell_radius:
-                                xy = np.vstack(surround_points)
-                            else:
-                                hex_cell = HexCell(
-                                    positon = cell.position,
-                                    pitch = cell_radius,
-                                    orientation = orientation
-                                )
-                                xy = np.vstack(
-                                    hex_cell.surround_points
-                                )
-                            if color is None:
-                                hexagon = Polygon(xy=xy, closed=True, zorder=zorder)
-                                patches.append(hexagon)
-                                if value is None:
-                                    colors.append([0., 0., 0., 0.])
-                                else:
-                                    colors.append(value)
-                            else:
-                                has_color = True
-                                if not color.startswith('#'):
-                                    color = TABLEAU_COLORS[f'tab:{color}']
-                                hexagon = Polygon(xy=xy, closed=True, zorder=zorder, color=color)
-                                # print(color, hexagon, hexagon.get_visible())
-                                patches.append(hexagon)
-                                colors.append(color)
-                        elif cell_shape == 'circ':
-                            central_point = cell.central_point[:2]
-                            circle_center = np.array(central_point) + np.array(offset)
-                            if color is None:
-                                circle = Circle(xy=circle_center, radius=cell_radius, zorder=zorder)
-                                patches.append(circle)
-                                if value is None:
-                                    colors.append([0., 0., 0., 0.])
-                                else:
-                                    colors.append(value)
-                            else:
-                                if not color.startswith('#'):
-                                    color = TABLEAU_COLORS[f'tab:{color}']
-                                circle = Circle(xy=circle_center, radius=cell_radius, zorder=zorder, color=color)
-                                patches.append(circle)
-                                colors.append(color)
-                    
-                    # Plot the wireframe of hexagon
-                    if show_wireframe:
-                        for point in surround_points:
-                            # plt.scatter(point[0], point[1], c='k')
-                            plt.plot(
-                                *list(zip(start_point, point)),
-                                c = 'k',
-                                zorder = 2,
-                                linewidth = linewidth
-                            )
-                            start_point = point
-                    # else:
-                    #     core_radius = max_ring_idx * self._pitch
-                    #     plt.xlim([-core_radius, +core_radius])
-                    #     plt.ylim([-core_radius, +core_radius])
-                    
-                    # Cell value
-                    plt.text(
-                        x = text_x,
-                        y = text_y,
-                        s = text_to_print,
-                        fontdict = {
-                            'family': 'Times New Roman',
-                            'size': text_size,
-                            # 'fontweight': 'bold'
-                        },
-                        horizontalalignment = 'center',
-                        verticalalignment = 'center',
-                        zorder = 3
-                    )
-        
-        if 'clim' in kwargs:
-            cmin, cmax = kwargs['clim']
-            colors.append(cmin)
-            colors.append(cmax)
+        cell_index = np.flatnonzero(self._arrays['r'] < max_ring_idx)
+        label_index, label_text = self._get_labels(keys.split('&'), cell_index, data_fmt)
+        wireframe_cells = np.unique(label_index)  # Cells with any label are framed
+
+        # Cell values, skipped if empty, too small to read, or too many cells to be readable
+        show_text = kwargs.get('show_text', True)
+        max_text_cells = kwargs.get('max_text_cells', 5000)
+        min_text_pixel = kwargs.get('min_text_pixel', 3.)
+        if show_text and cell_index.size > max_text_cells:
+            print("Text is turned off for {} cells (more than max_text_cells = {})".format(cell_index.size, max_text_cells))
+            show_text = False
+        if show_text and text_size * dpi / 72. >= min_text_pixel:
+            self._add_texts(
+                label_index,
+                label_text,
+                offset_x = - self._pitch * offset_factor,
+                text_size = text_size
+            )
 
-        # Plot all the hexagons
+        # Plot all the hexagons and circles
         if color_map:
-            if not has_color:
-                p = PatchCollection(patches=patches, alpha=0.7)
-                p.set_array(np.array(colors))
-                p.set_cmap(color_map)
-            else:
-                p = PatchCollection(patches=patches)             # Solid color if given color
-                p.set_color(colors)
-            self._axes.add_collection(p)
+            mappable = self._add_fill_collections(
+                keys = keys.split('&'),
+                cell_index = np.flatnonzero(self._arrays['r'] < max_ring_idx),
+                color_map = color_map,
+                clim = kwargs.get('clim', None)
+            )
             if show_colorbar:
-                plt.rc('font', size=16)
+                mpl.matplotlib.rc('font', size=16)
                 self._figure.colorbar(
-                    p,
+                    mappable,
                     ax=self._axes,
                     format=colorbar_format
                 )
+
+        # Plot the wireframe of all hexagons, where the edge shared by adjacent cells is drawn once
+        if show_wireframe and len(wireframe_cells) > 0:
+            self._axes.add_collection(mpl.LineCollection(
+                self._get_wireframe_segments(wireframe_cells),
+                colors = 'k',
+                zorder = 2,
+                linewidths = linewidth,
+                capstyle = 'projecting'
+            ))
+            self._axes.autoscale_view()
         
         if not show_wireframe:
             core_radius = max_ring_idx * self._pitch
-            plt.xlim([-core_radius, +core_radius])
-            plt.ylim([-core_radius, +core_radius])
+            self._axes.set_xlim([-core_radius, +core_radius])
+            self._axes.set_ylim([-core_radius, +core_radius])
         
         if 'xlim' in kwargs:
-            plt.xlim(kwargs['xlim'])
+            self._axes.set_xlim(kwargs['xlim'])
         if 'ylim' in kwargs:
-            plt.ylim(kwargs['ylim'])
+            self._axes.set_ylim(kwargs['ylim'])
         
         if not show_axis:
-            plt.axis('off')
+            self._axes.axis('off')
 
-        if save_path is None:
-            plt.show()
-        elif save_path == '--supress':
-            pass
-        else:
-            if not os.path.exists(save_path):
-                save_path = os.path.join(os.getcwd(), save_path)
-            dir_path = os.path.dirname(save_path)
-            if not os.path.exists(dir_path):
-                os.mkdir(dir_path)
-            
-            plt.savefig(save_path, transparent=True)
+        _save_figure(self._figure, save_path)
+
+    def _get_labels(self, keys: list, cell_index: np.ndarray, data_fmt: str = 'default') -> tuple:
+        """
+        Get the text labels of given keys in given cells, ordered by cell then key
+
+        Returns
+        -------
+        tuple(index: np.ndarray, text: np.ndarray), the cell index and the text of every label
+        """
+        r, k = self._arrays['r'][cell_index].tolist(), self._arrays['k'][cell_index].tolist()
+        index, key_order, text = list(), list(), list()
+        for i, key in enumerate(keys):
+            if key == 'position':
+                found = cell_index
+                labels = np.array(["Cell({:d},{:d})".format(*_) for _ in zip(r, k)], dtype=object)
+            elif key == 'position-brief':
+                found = cell_index
+                labels = np.array(["({:d},{:d})".format(*_) for _ in zip(r, k)], dtype=object)
+            else:
+                mask = self._data[key].take('mask', cell_index) if key in self._data else np.zeros(cell_index.size, dtype=np.bool_)
+                for j in np.flatnonzero(~mask).tolist():
+                    print("Key not found: self._lattice[{}][{}][{}]".format(r[j], k[j], key))
+                found = cell_index[mask]
+                labels = _format_values(self._data[key].take('value', found), data_fmt) if found.size else np.empty(0, dtype=object)
+            index.append(found)
+            key_order.append(np.full(found.size, i))
+            text.append(labels)
+        index, key_order, text = np.concatenate(index), np.concatenate(key_order), np.concatenate(text)
+        order = np.lexsort((key_order, index))
+        return index[order], text[order]
+
+    def _add_texts(self, cell_index: np.ndarray, text: np.ndarray, offset_x: float = 0., text_size: float = 8) -> None:
+        """
+        Add the text labels at the centers of given cells, where empty labels are skipped
+        """
+        font = _import_matplotlib().FontProperties(family='Times New Roman', size=text_size)
+        shown = text != ''
+        x = (self._arrays['center_x'][cell_index[shown]] + offset_x).tolist()
+        y = self._arrays['center_y'][cell_index[shown]].tolist()
+        for x_, y_, s_ in zip(x, y, text[shown].tolist()):
+            self._axes.text(
+                x = x_,
+                y = y_,
+                s = s_,
+                fontproperties = font,
+                horizontalalignment = 'center',
+                verticalalignment = 'center',
+                zorder = 3
+            )
+
+    def _add_fill_collections(self, keys: list, cell_index: np.ndarray, color_map: str, clim: tuple = None) -> Any:
+        """
+        Fill the given cells with the data of keys, as one PolyCollection / EllipseCollection per group
+
+        Cells are filled by value through `color_map`, or by their solid color if given.
+        Fillings are drawn in order of zorder, then cell and key, where hexagons go before circles of equal zorder.
+
+        Returns
+        -------
+        The mappable of colorbar, shared by all the value-mapped collections
+        """
+        mpl = _import_matplotlib()
+
+        columns = {name: list() for name in ('index', 'key', 'zorder', 'shape', 'radius', 'offset', 'orientation', 'color', 'value')}
+        for key_order, key in enumerate(keys):
+            if key not in self._data:
+                continue
+            key_data = self._data[key]
+            index = cell_index[key_data.take('mask', cell_index)]
+            palette = [color if color.startswith('#') else mpl.TABLEAU_COLORS[f'tab:{color}'] for color in key_data.palette]
+            columns['index'].append(index)
+            columns['key'].append(np.full(index.size, key_order))
+            columns['zorder'].append(key_data.take('zorder', index))
+            columns['shape'].append(key_data.take('shape', index))
+            columns['radius'].append(key_data.take('radius', index))
+            columns['offset'].append(key_data.take('offset', index))
+            columns['orientation'].append(key_data.take('orientation', index))
+            columns['color'].append(np.array(palette + [None], dtype=object)[key_data.take('color', index)])
+            columns['value'].append(self._to_float(key_data.take('value', index)))
+        columns = {
+            name: np.concatenate(column) if column else np.empty(0, dtype=object)
+            for name, column in columns.items()
+        }
+
+        order = np.lexsort((columns['key'], columns['index'], columns['zorder']))
+        columns = {name: column[order] for name, column in columns.items()}
+        mapped = np.array([color is None for color in columns['color']], dtype=np.bool_)
+
+        # Shared norm of all the value-mapped cells
+        values = columns['value'][mapped].astype(np.float64)
+        values = values[np.isfinite(values)]
+        if clim is not None:
+            values = np.append(values, clim)
+        norm = mpl.Normalize(vmin=values.min(), vmax=values.max()) if values.size > 0 else mpl.Normalize(vmin=0., vmax=1.)
+
+        mapped_collections = list()
+        for zorder in np.unique(columns['zorder']):
+            for shape in range(len(CELL_SHAPES)):
+                for is_mapped in (True, False):
+                    selected = (columns['zorder'] == zorder) & (columns['shape'] == shape) & (mapped == is_mapped)
+                    if not selected.any():
+                        continue
+                    index = columns['index'][selected]
+                    radius = columns['radius'][selected]
+                    center = np.column_stack((self._arrays['center_x'][index], self._arrays['center_y'][index]))
+
+                    if CELL_SHAPES[shape] == 'hex':
+                        # The hexagon of cell itself if no radius given
+                        no_radius = radius == 0.
+                        vertices = hexagon_vertices(
+                            center_x = center[:, 0],
+                            center_y = center[:, 1],
+                            pitch = np.where(no_radius, self._pitch, radius),
+                            orientation = np.where(
+                                no_radius,
+                                self._get_cell_orientation(index),
+                                columns['orientation'][selected]
+                            )
+                        )
+                        collection = mpl.PolyCollection(vertices, closed=True)
+                    else:
+                        collection = mpl.EllipseCollection(
+                            widths = 2 * radius,
+                            heights = 2 * radius,
+                            angles = 0.,
+                            units = 'xy',
+                            offsets = center + columns['offset'][selected],
+                            offset_transform = self._axes.transData
+                        )
+
+                    if is_mapped:
+                        collection.set_array(np.ma.masked_invalid(columns['value'][selected]))
+                        collection.set_cmap(color_map)
+                        collection.set_norm(norm)
+                        collection.set_alpha(0.7)
+                        mapped_collections.append(collection)
+                    else:
+                        collection.set_color(columns['color'][selected].tolist())  # Solid color if given color
+                    self._axes.add_collection(collection)
+
+        if mapped_collections:
+            return mapped_collections[0]
+        return mpl.PolyCollection([], cmap=color_map, norm=norm, alpha=0.7)  # Nothing mapped
+
+    @staticmethod
+    def _to_float(values: np.ndarray) -> np.ndarray:
+        # Values as float, where None and non-numeric values are NaN
+        if values.dtype != object:
+            return values.astype(np.float64)
+        res = np.full(values.size, np.nan)
+        for i, value in enumerate(values):
+            if isinstance(value, numbers.Real):
+                res[i] = value
+        return res
+
+    def _get_numeric_values(self, key: str) -> np.ndarray:
+        # Values of key in all cells as float, NaN for the cells without data or with None
+        key_data = self._data[key]
+        index = np.arange(self.cell_num)
+        values, mask = key_data.take('value', index), key_data.take('mask', index)
+        if values.dtype == object and not all(_ is None or isinstance(_, numbers.Real) for _ in values[mask]):
+            raise ValueError(f"Values of key {key} are not numeric.")
+        values = self._to_float(values)
+        values[~mask] = np.nan
+        return values
+
+    def _get_cell_orientation(self, cell_index: np.ndarray) -> np.ndarray:
+        res = np.zeros(len(cell_index))
+        for i, index in enumerate(cell_index.tolist()):
+            if self._cells[index] is not None:
+                res[i] = self._cells[index].orientation
+        return res
+
+    def _get_wireframe_segments(self, cell_index: np.ndarray) -> np.ndarray:
+        """
+        Get the edges of given cells as line segments of shape (M, 2, 2), without duplicates
+        """
+        vertices = hexagon_vertices(
+            center_x = self._arrays['center_x'][cell_index],
+            center_y = self._arrays['center_y'][cell_index],
+            pitch = self._pitch,
+            orientation = self._get_cell_orientation(cell_index)
+        )
+        segments = np.stack((np.roll(vertices, 1, axis=1), vertices), axis=2).reshape(-1, 2, 2)
+
+        # Identify an edge by its end points rounded to the resolution of 1E-6 pitch, regardless of direction
+        points = np.round(segments / (1E-6 * self._pitch)).astype(np.int64).reshape(-1, 2, 2)
+        swap = (points[:, 0, 0] > points[:, 1, 0]) \
+            | ((points[:, 0, 0] == points[:, 1, 0]) & (points[:, 0, 1] > points[:, 1, 1]))
+        points[swap] = points[swap, ::-1]
+        _, unique_index = np.unique(points.reshape(-1, 4), axis=0, return_index=True)
+        return segments[np.sort(unique_index)]
 
     # def append_data_by_row(self, key: str, value: Any):
     #     """
@@ -434,64 +1079,406 @@ class HexLattice:
         (1,4)  (0,0)  (1,1)    =>   (1,0)  (1,1)  (1,2)
            (1,3)   (1,2)               (2,0)   (2,1)
         """
-        ring_to_axial = OrderedDict()
-        axial_to_ring = OrderedDict()
+        r, k, row, col = self._get_ring_axial_arrays()
+        _, axial_to_ring_index = self.generate_ring_axial_index()
+
+        # Both tables are ordered row-by-row
+        ring_coor = list(zip(r[axial_to_ring_index].tolist(), k[axial_to_ring_index].tolist()))
+        axial_coor = list(zip(row[axial_to_ring_index].tolist(), col[axial_to_ring_index].tolist()))
+        ring_to_axial = OrderedDict(zip(ring_coor, axial_coor))
+        axial_to_ring = OrderedDict(zip(axial_coor, ring_coor))
 
-        try:
-            import numpy as np
-        except ImportError as e:
-            print("Numpy could not be imported.")
-
-        # Traverse the core row-by-row
-        #     l: row    r: ring    k: clockwise order
-        for l in range(2*self._ring - 1):
-            dis2centerLine = abs(self._ring - 1 - l)
-            s = -1
-
-            # Go from outer ring to inner ring (120 ~ 240 degree)
-            for j in range(self._ring - 1 - dis2centerLine):
-                r = (self._ring - 1) - j
-                k = 5 * r + j - l
-                s += 1
-                ring_to_axial[(r,k)] = (l,s)
-                axial_to_ring[(l,s)] = (r,k)
-                # print("0 Ring({},{}) == Axial({},{})".format(r, k, l, s))
-            
-            # Go through the the inneset ring in current row (60 ~ 120 & 240 ~ 300 degree)
-            r = dis2centerLine
-            kCenterLine = 4 * r if r > 0 else 1
-            for j in range(dis2centerLine):
-                k = kCenterLine + (r + j) * int(np.sign(self._ring - 1 - l))
-                s += 1
-                ring_to_axial[(r,k)] = (l,s)
-                axial_to_ring[(l,s)] = (r,k)
-            
-            # The assembly in line of 60 & 300 degree
-            k = 2 * dis2centerLine if self._ring - 1 - l < 0 else 0
-            s += 1
-            ring_to_axial[(r,k)] = (l,s)
-            axial_to_ring[(l,s)] = (r,k)
-
-            # Go from the inner ring to outer ring (300 ~ 60 degree)
-            for j in range(self._ring - 1 - dis2centerLine):
-                r = 1 + j + dis2centerLine
-                k = l + r + 1 - self._ring
-                s += 1
-                ring_to_axial[(r,k)] = (l,s)
-                axial_to_ring[(l,s)] = (r,k)
-        
         return ring_to_axial, axial_to_ring
 
+    def generate_ring_axial_index(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Generate the Ring-Axial Conversion Index Arrays, computed once and cached
+
+        Cells are indexed ring-by-ring (see `generate_lattice`) or row-by-row (axial order, see `generate_ring_axial_hash`).
+
+        Returns
+        -------
+        tuple(ring_to_axial: np.ndarray, axial_to_ring: np.ndarray)
+        - ring_to_axial[i]: the axial index of the cell at ring index i
+        - axial_to_ring[j]: the ring index of the cell at axial index j
+
+        Example
+        -------
+        ```python
+        >>> ring_to_axial, axial_to_ring = lattice.generate_ring_axial_index()
+        >>> data_in_ring_order = data_in_axial_order[ring_to_axial]
+        >>> data_in_axial_order = data_in_ring_order[axial_to_ring]
+        ```
+        """
+        if self._ring_axial_index is None:
+            _, _, row, col = self._get_ring_axial_arrays()
+            axial_to_ring = np.lexsort((col, row)).astype(np.int32)
+            ring_to_axial = np.empty_like(axial_to_ring)
+            ring_to_axial[axial_to_ring] = np.arange(axial_to_ring.size, dtype=np.int32)
+            for array in (ring_to_axial, axial_to_ring):
+                array.flags.writeable = False
+            self._ring_axial_index = (ring_to_axial, axial_to_ring)
+        return self._ring_axial_index
+
+    def generate_neighbour_index(self, order: str = 'ring') -> np.ndarray:
+        """
+        Generate the Neighbour Index Table of all cells, computed once and cached
+
+        Input
+        -----
+        order: str, 'ring' for ring-by-ring indices (see `generate_lattice`), or 'axial' for row-by-row
+
+        Returns
+        -------
+        np.ndarray of int32 of shape (N, 6), where `table[i, j]` is the index of the neighbour of cell i
+        at the j-th direction of `CubeCoordinate.direction_vectors_dict`, or -1 out of the lattice
+
+        Example
+        -------
+        ```python
+        >>> neighbours = lattice.generate_neighbour_index()
+        >>> padded = np.append(flux, 0.)               # Zero flux out of the lattice
+        >>> leakage = 6 * flux - padded[neighbours].sum(axis=1)
+        ```
+        """
+        if order not in ('ring', 'axial'):
+            raise ValueError(f"Invalid order: {order}, which should be 'ring' or 'axial'")
+        if order not in self._neighbour_index:
+            if order == 'ring':
+                r, k = self._get_ring_axial_arrays()[:2]
+                x, y, z = cube_neighbours(*ring_to_cube(r, k))
+                ring, clock = cube_to_ring(x, y, z)
+                table = np.where(ring < self._ring, ring_to_index(ring, clock), -1).astype(np.int32)
+            else:
+                ring_to_axial, axial_to_ring = self.generate_ring_axial_index()
+                table = self.generate_neighbour_index(order='ring')[axial_to_ring]
+                table = np.where(table >= 0, ring_to_axial[table], -1).astype(np.int32)
+            table.flags.writeable = False
+            self._neighbour_index[order] = table
+        return self._neighbour_index[order]
+
+    def generate_position_index(self) -> np.ndarray:
+        """
+        Generate the Position Index Table, a dense array from cube coordinates to ring indices, computed once and cached
+
+        Returns
+        -------
+        np.ndarray of int32 of shape (2*ring-1, 2*ring-1), where `table[z + ring-1, x + ring-1]`
+        is the ring index of the cell at CubeCoordinate(x, y, z), or -1 out of the lattice
+        """
+        if self._position_index is None:
+            r, k = self._get_ring_axial_arrays()[:2]
+            x, _, z = ring_to_cube(r, k)
+            table = np.full((2 * self._ring - 1, 2 * self._ring - 1), -1, dtype=np.int32)
+            table[z + (self._ring - 1), x + (self._ring - 1)] = np.arange(self.cell_num, dtype=np.int32)
+            table.flags.writeable = False
+            self._position_index = table
+        return self._position_index
+
+    def generate_symmetry_index(self, symmetry: int = 6) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Generate the index of the fundamental domain of a symmetric core, computed once and cached
+
+        Cells equivalent under the rotations by 360/symmetry degrees (and under the reflection about
+        the middle of sector 0 for 12, see `cube_reflect`) share one fundamental cell, the one of smallest ring index.
+        The fundamental domain is the central cell with, in every ring, sectors 0 and 1 for 3,
+        sector 0 for 6, and the first half of sector 0 (k <= r // 2) for 12.
+
+        Input
+        -----
+        symmetry: int, one of SYMMETRIES, 1 for the full core
+
+        Returns
+        -------
+        tuple(fundamental: np.ndarray, unfold: np.ndarray) of int32, read-only, where `fundamental` are the ring
+        indices of the fundamental cells, and `unfold[i]` is the position in `fundamental` of the cell equivalent to cell i,
+        so that `fundamental_values[unfold]` unfolds values to the full core in one gather
+
+        Example
+        -------
+        >>> fundamental, unfold = lattice.generate_symmetry_index(6)
+        >>> full_power = sixth_power[unfold]    # sixth_power is ring-by-ring over the 1/6 core
+        """
+        if symmetry not in self._symmetry_index:
+            images = self._get_symmetry_images(symmetry)
+            representative = images.min(axis=1)
+            fundamental = np.unique(representative).astype(np.int32)
+            unfold = np.searchsorted(fundamental, representative).astype(np.int32)
+            orbits = images[fundamental]
+            for array in (fundamental, unfold, orbits):
+                array.flags.writeable = False
+            self._symmetry_index[symmetry] = (fundamental, unfold, orbits)
+        return self._symmetry_index[symmetry][:2]
+
+    def generate_symmetry_orbits(self, symmetry: int = 6) -> np.ndarray:
+        """
+        Generate the orbits of the fundamental cells of a symmetric core, computed once and cached
+
+        Returns
+        -------
+        np.ndarray of int32 of shape (number of fundamental cells, symmetry), read-only, where `orbits[i, j]`
+        is the ring index of the image of the i-th fundamental cell (see `generate_symmetry_index`) under the j-th
+        rotation (or reflection), so that every cell of an orbit appears the same number of times
+        """
+        self.generate_symmetry_index(symmetry)
+        return self._symmetry_index[symmetry][2]
+
+    def _get_symmetry_images(self, symmetry: int) -> np.ndarray:
+        # Ring indices of the images of all cells under every rotation (and reflection), of shape (N, symmetry)
+        if symmetry not in SYMMETRIES:
+            raise ValueError(f"Invalid symmetry: {symmetry}, which should be one of {SYMMETRIES}")
+        x, y, z = self._get_cube_arrays()
+        images = list()
+        for steps in range(0, 6, 6 // min(symmetry, 6)):
+            image = cube_rotate(x, y, z, steps)
+            images.append(self.cube_index(*image))
+            if symmetry == 12:
+                images.append(self.cube_index(*cube_reflect(*image)))
+        return np.column_stack(images).astype(np.int32)
+
+    def cube_index(self, x, y, z):
+        """
+        Get the ring indices of cells at cube coordinates, -1 out of the lattice
+
+        Input
+        -----
+        x, y, z: int or array of int
+
+        Returns
+        -------
+        int if the input is scalar, or else np.ndarray of int32
+        """
+        table = self.generate_position_index()
+        if isinstance(x, numbers.Integral) and isinstance(y, numbers.Integral) and isinstance(z, numbers.Integral):
+            # Scalar fast path
+            if x + y + z != 0:
+                raise ValueError(f"Input cube coordinates are invalid: ({x}, {y}, {z})")
+            row, col = z + (self._ring - 1), x + (self._ring - 1)
+            if 0 <= row < table.shape[0] and 0 <= col < table.shape[1]:
+                return int(table[row, col])
+            return -1
+        x, y, z = np.broadcast_arrays(*(np.asarray(_).astype(np.int32, copy=False) for _ in (x, y, z)))
+        if np.any(x + y + z != 0):
+            raise ValueError("Input cube coordinates are invalid: x + y + z != 0.")
+        row, col = z + (self._ring - 1), x + (self._ring - 1)
+        inside = (row >= 0) & (row < table.shape[0]) & (col >= 0) & (col < table.shape[1])
+        index = np.full(x.shape, -1, dtype=np.int32)
+        index[inside] = table[row[inside], col[inside]]
+        return int(index) if index.ndim == 0 else index
+
+    def offset_index(self, row, col):
+        """
+        Get the ring indices of cells at offset coordinates (see `OffsetCoordinate`), -1 out of the lattice
+        """
+        return self.cube_index(*offset_to_cube(row, col))
+
+    def axial_index(self, row, col):
+        """
+        Get the ring indices of cells at axial (row,column) coordinates (see `generate_ring_axial_hash`),
+        -1 out of the lattice
+        """
+        return self.cube_index(*axial_to_cube(row, col, ring=self._ring))
+
+    def locate(self, x, y, orientation: float = 0.):
+        """
+        Get the ring indices of cells containing (x,y) Cartesian points, -1 out of the lattice
+
+        Input
+        -----
+        x, y: float or array of float, the points
+        orientation: float, the rotation angle of the lattice about the origin
+
+        Returns
+        -------
+        int if the input is scalar, or else np.ndarray of int32
+
+        Example
+        -------
+        >>> index = lattice.locate(tally_x, tally_y)
+        >>> counts = np.bincount(index[index >= 0], minlength=lattice.cell_num)
+        """
+        # Table with a border of -1, where all the points out of the table are clipped to
+        table = np.pad(self.generate_position_index(), 1, constant_values=-1)
+        size = table.shape[1]
+        cube_x, _, cube_z = xy_to_cube(x, y, pitch=self._pitch, orientation=orientation)
+        row = np.clip(cube_z + self._ring, 0, size - 1)
+        col = np.clip(cube_x + self._ring, 0, size - 1)
+        index = table.ravel().take(row * size + col)
+        return int(index) if index.ndim == 0 else index
+
+    def find_index(self, position: CubeCoordinate or OffsetCoordinate or RingCoordinate) -> int:
+        """
+        Get the ring index of the cell at given position, -1 out of the lattice
+        """
+        if isinstance(position, CubeCoordinate):
+            return self.cube_index(position.x, position.y, position.z)
+        elif isinstance(position, OffsetCoordinate):
+            return self.offset_index(position.r, position.c)
+        elif isinstance(position, RingCoordinate):
+            r, k = position.r, position.k
+            if not 0 <= r < self._ring or not 0 <= k < max(6 * r, 1):
+                return -1
+            return int(ring_to_index(r, k))
+        raise TypeError(f"Invalid position: {position}")
+
+    def find_cell(self, position: CubeCoordinate or OffsetCoordinate or RingCoordinate) -> HexCell:
+        """
+        Get the cell at given position, None out of the lattice
+
+        Example
+        -------
+        >>> lattice.find_cell(OffsetCoordinate(r=1, c=0))['power']
+        """
+        if not self._lattice:
+            raise SyntaxError("Lattice has not been genderated yet.")
+        index = self.find_index(position)
+        return self._get_cell(index) if index >= 0 else None
+
+    def cell_distance(self, index_a, index_b):
+        """
+        Get the hex distances (number of steps between neighbours) between cells of ring indices
+
+        The inputs are broadcast, e.g. `lattice.cell_distance(rods[:, None], np.arange(lattice.cell_num))`
+        gives the distances from every rod to all the cells.
+
+        Returns
+        -------
+        int if the inputs are scalar, or else np.ndarray of int32
+        """
+        x, y, z = self._get_cube_arrays()
+        index_a, index_b = self._check_index(index_a), self._check_index(index_b)
+        distance = cube_distance(x[index_a], y[index_a], z[index_a], x[index_b], y[index_b], z[index_b])
+        return int(distance) if distance.ndim == 0 else distance
+
+    def distance_matrix(self, index=None) -> np.ndarray:
+        """
+        Get the matrix of hex distances between all pairs of cells
+
+        Input
+        -----
+        index: array of int, the ring indices of cells, all the cells by default
+
+        Returns
+        -------
+        np.ndarray of int32 of shape (N, N), where `matrix[i, j]` is the distance between cell i and cell j
+
+        Example
+        -------
+        >>> distance = lattice.distance_matrix()
+        >>> shadowed = (distance[rods] <= 2).any(axis=0)  # Cells within 2 steps of any rod
+        """
+        index = np.arange(self.cell_num) if index is None else np.asarray(index).ravel()
+        return self.cell_distance(index[:, None], index[None, :])
+
+    def line_index(self, start: int, end: int) -> np.ndarray:
+        """
+        Get the ring indices of cells crossed by the line between the centers of two cells, see `cube_line`
+
+        Returns
+        -------
+        np.ndarray of int32 of shape (distance+1,), from the starting cell to the ending cell
+        """
+        x, y, z = self._get_cube_arrays()
+        start, end = int(self._check_index(start)), int(self._check_index(end))
+        # The lattice is convex, so that the line stays inside
+        return self.cube_index(*cube_line(x[start], y[start], z[start], x[end], y[end], z[end]))
+
+    def range_index(self, center, distance: int) -> np.ndarray:
+        """
+        Get the ring indices of cells within given hex distance of centers
+
+        Input
+        -----
+        center: int or array of int of shape (N,), the ring indices of centers
+        distance: int, the largest distance to the centers
+
+        Returns
+        -------
+        np.ndarray of int32, of the cells inside the lattice ring-by-ring around a scalar center,
+        or else of shape (N, 3*distance*(distance+1)+1) with -1 for the cells out of the lattice
+        """
+        if distance < 0:
+            raise ValueError(f"Invalid distance: {distance}")
+        x, y, z = self._get_cube_arrays()
+        center = self._check_index(center)
+        index = self.cube_index(*hex_spiral(x[center], y[center], z[center], ring=distance + 1))
+        return index[index >= 0] if center.ndim == 0 else index
+
+    def _check_index(self, index) -> np.ndarray:
+        index = np.asarray(index)
+        if np.any((index < 0) | (index >= self.cell_num)):
+            raise ValueError(f"Input indices are out of the lattice of {self.cell_num} cells.")
+        return index
+
+    def _get_cube_arrays(self) -> tuple:
+        # The cube coordinates of generated lattice, otherwise computed on the fly
+        if self._arrays:
+            return self._arrays['x'], self._arrays['y'], self._arrays['z']
+        return ring_to_cube(*ring_coordinates(self._ring))
+
+    def _get_ring_axial_arrays(self) -> tuple:
+        # The arrays of generated lattice, otherwise computed on the fly
+        if self._arrays:
+            return self._arrays['r'], self._arrays['k'], self._arrays['row'], self._arrays['col']
+        r, k = ring_coordinates(self._ring)
+        x, y, z = ring_to_cube(r, k)
+        return (r, k) + cube_to_axial(x, y, z, ring=self._ring)
+
     @property
     def lattice(self) -> list:
         return self._lattice
 
+    @property
+    def arrays(self) -> dict:
+        return self._arrays
+
+    @property
+    def ring(self) -> int:
+        return self._ring
+
+    @property
+    def pitch(self) -> float:
+        return self._pitch
+
+    @property
+    def cell_num(self) -> int:
+        return 3 * self._ring * (self._ring - 1) + 1
+
     def get_matplotlib_figure(self):
         return self._figure
     
     def get_matplotlib_axes(self):
         return self._axes
 
+    def __getstate__(self) -> dict:
+        # Geometry is regenerated when unpickled, so that only the data and orientation of cells are pickled
+        state = {'ring': self._ring, 'pitch': self._pitch, 'data': self._data, 'orientation': None}
+        if self._lattice:
+            state['orientation'] = self._get_cell_orientation(np.arange(self.cell_num))
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(ring=state['ring'], pitch=state['pitch'])
+        if state['orientation'] is not None:
+            self.generate_lattice()
+            for index in np.flatnonzero(state['orientation']).tolist():
+                self._get_cell(index).orientation = state['orientation'][index]
+        self._data = state['data']
+
+    def close(self) -> None:
+        """
+        Close the figure of lattice, releasing it from pyplot
+        """
+        _close_figure(self._figure)
+        self._figure = None
+        self._axes = None
+
+    def __enter__(self) -> 'HexLattice':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
 
 
 class RowAppender:
@@ -499,7 +1486,7 @@ class RowAppender:
     def __init__(self, lattice: HexLattice) -> None:
         self._idx = dict()
         self._lattice = lattice
-        self._axial_to_ring = tuple(lattice.generate_ring_axial_hash()[1].items())
+        self._axial_to_ring = lattice.generate_ring_axial_index()[1]
     
     def append(
             self,
@@ -512,16 +1499,17 @@ class RowAppender:
             color        : str                 = None,
             orientation  : float               = 0.
         ) -> None:        
-        current_cell = self.get_current_cell(key=key)
-        current_cell[key] = {
-            'value'      : value,
-            'shape'      : cell_shape,
-            'radius'     : cell_radius,
-            'offset'     : offset,
-            'zorder'     : zorder,
-            'color'      : color,
-            'orientation': orientation
-        }
+        self._lattice.data.set(
+            key,
+            self._get_current_index(key=key),
+            value       = value,
+            shape       = cell_shape,
+            radius      = cell_radius,
+            offset      = offset,
+            zorder      = zorder,
+            color       = color,
+            orientation = orientation
+        )
         self._idx[key] += 1
 
         # if orientation:
@@ -532,15 +1520,191 @@ class RowAppender:
         return len(self._axial_to_ring)
 
     def get_current_cell(self, key) -> HexCell:
+        return self._lattice._get_cell(self._get_current_index(key=key))
+
+    def _get_current_index(self, key) -> int:
         # Count total number for every single key
         if key not in self._idx:
             self._idx[key] = 0
         try:
-            aixal_coor, ring_coor = self._axial_to_ring[self._idx[key]]
+            ring_index = self._axial_to_ring[self._idx[key]]
         except IndexError:
             raise IndexError("Index {} out of range {}".format(
                 self._idx[key], len(self._axial_to_ring)
             ))
         
-        r, k = ring_coor
-        return self._lattice.lattice[r][k]
+        return int(ring_index)
+
+
+class RenderTemplate:
+
+    def __init__(
+            self,
+            lattice        : HexLattice,
+            color_map      : str   = 'jet',
+            text_size      : float = 8,
+            offset_factor  : float = 0.,
+            max_ring_idx   : int   = -1,
+            show_wireframe : bool  = True,
+            show_colorbar  : bool  = True,
+            show_axis      : bool  = False,
+            colorbar_format: str   = "{x:.2f}",
+            **kwargs
+        ) -> None:
+        """
+        Figure of a lattice built once, and rendered for many keys by updating only the colors, clim and texts
+
+        Every cell within max_ring_idx is filled by the value of key through color_map,
+        so that only the values are used, but not the shape, radius or color of cell data.
+
+        Input
+        -----
+        lattice: HexLattice, generated lattice
+        Others: the same as `HexLattice.plot`, including kwargs figsize, dpi, linewidth, xlim, ylim,
+        show_text, max_text_cells, min_text_pixel and backend
+
+        Example
+        -------
+        >>> template = RenderTemplate(lattice, color_map='jet', dpi=600)
+        >>> for i in range(4):
+        ...     template.render(key=f'P{i}', save_path=f'power_p{i}.png', data_fmt='E')
+        """
+        if not lattice.lattice:
+            raise SyntaxError("Lattice has not been genderated yet.")
+        mpl = _import_matplotlib()
+
+        self._backend = kwargs.get('backend', 'pyplot')
+        self._rc = {'font.family': 'Times New Roman'}
+        if show_colorbar:
+            self._rc['font.size'] = 16
+        with _rc_context(self._backend, self._rc):
+            self._lattice = lattice
+            if max_ring_idx < 0:
+                max_ring_idx = lattice.ring
+            self._cell_index = np.flatnonzero(lattice.arrays['r'] < max_ring_idx)
+            center_x = lattice.arrays['center_x'][self._cell_index]
+            center_y = lattice.arrays['center_y'][self._cell_index]
+            dpi = kwargs.get('dpi', 400)
+            self._figure, self._axes = _new_figure(figsize=kwargs.get('figsize', (4, 4)), dpi=dpi, backend=self._backend)
+
+            # Fillings of all cells, colored by the values of each key
+            self._collection = mpl.PolyCollection(
+                hexagon_vertices(
+                    center_x = center_x,
+                    center_y = center_y,
+                    pitch = lattice.pitch,
+                    orientation = lattice._get_cell_orientation(self._cell_index)
+                ),
+                closed = True,
+                cmap = color_map,
+                alpha = 0.7
+            )
+            self._collection.set_array(np.ma.masked_all(self._cell_index.size))
+            self._axes.add_collection(self._collection)
+            if show_colorbar:
+                self._figure.colorbar(self._collection, ax=self._axes, format=colorbar_format)
+
+            # Texts of all cells, updated and skipped if empty
+            self._texts = list()
+            show_text = kwargs.get('show_text', True)
+            max_text_cells = kwargs.get('max_text_cells', 5000)
+            if show_text and self._cell_index.size > max_text_cells:
+                print("Text is turned off for {} cells (more than max_text_cells = {})".format(self._cell_index.size, max_text_cells))
+                show_text = False
+            if show_text and text_size * dpi / 72. >= kwargs.get('min_text_pixel', 3.):
+                font = mpl.FontProperties(family='Times New Roman', size=text_size)
+                text_x = (center_x - lattice.pitch * offset_factor).tolist()
+                for x_, y_ in zip(text_x, center_y.tolist()):
+                    self._texts.append(self._axes.text(
+                        x = x_,
+                        y = y_,
+                        s = '',
+                        fontproperties = font,
+                        horizontalalignment = 'center',
+                        verticalalignment = 'center',
+                        zorder = 3
+                    ))
+
+            if show_wireframe:
+                self._axes.add_collection(mpl.LineCollection(
+                    lattice._get_wireframe_segments(self._cell_index),
+                    colors = 'k',
+                    zorder = 2,
+                    linewidths = kwargs.get('linewidth', 1),
+                    capstyle = 'projecting'
+                ))
+                self._axes.autoscale_view()
+            else:
+                core_radius = max_ring_idx * lattice.pitch
+                self._axes.set_xlim([-core_radius, +core_radius])
+                self._axes.set_ylim([-core_radius, +core_radius])
+            if 'xlim' in kwargs:
+                self._axes.set_xlim(kwargs['xlim'])
+            if 'ylim' in kwargs:
+                self._axes.set_ylim(kwargs['ylim'])
+            if not show_axis:
+                self._axes.axis('off')
+
+    def render(
+            self,
+            key      : str,
+            save_path: PathLike = '--supress',
+            clim     : tuple    = None,
+            data_fmt : str      = 'default'
+        ) -> None:
+        """
+        Render the values of key, where cells without value are transparent
+
+        Input
+        -----
+        key: str, the key of data
+        save_path: PathLike, shown if None, not saved if '--supress'
+        clim: tuple(float, float), the range of colorbar extended by the values
+        data_fmt: str, the format of texts, the same as `HexLattice.plot`
+        """
+        data = self._lattice.data
+        if key not in data:
+            raise KeyError(f"Key not found: {key}")
+        key_data = data[key]
+        has_value = key_data.take('mask', self._cell_index)
+        values = np.full(self._cell_index.size, np.nan)
+        values[has_value] = HexLattice._to_float(key_data.take('value', self._cell_index[has_value]))
+        values = np.ma.masked_invalid(values)
+        self._collection.set_array(values)
+
+        bounds = values.compressed()
+        if clim is not None:
+            bounds = np.append(bounds, clim)
+        if bounds.size > 0:
+            self._collection.set_clim(bounds.min(), bounds.max())
+        else:
+            self._collection.set_clim(0., 1.)
+
+        if self._texts:
+            text = np.full(self._cell_index.size, '', dtype=object)
+            text[has_value] = _format_values(key_data.take('value', self._cell_index[has_value]), data_fmt)
+            for text_artist, s_ in zip(self._texts, text.tolist()):
+                text_artist.set_text(s_)
+
+        with _rc_context(self._backend, self._rc):
+            _save_figure(self._figure, save_path)
+
+    def get_matplotlib_figure(self):
+        return self._figure
+
+    def get_matplotlib_axes(self):
+        return self._axes
+
+    def close(self) -> None:
+        """
+        Close the figure of template, releasing it from pyplot
+        """
+        _close_figure(self._figure)
+        self._figure = None
+        self._axes = None
+
+    def __enter__(self) -> 'RenderTemplate':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,343 @@
+"""
+Hexagonal Lattice
+Columnar Data Storage of Hexagonal Lattice
+
+@Author: LZK
+@Date: 2023-11-20
+"""
+import numbers
+from typing import Any
+from collections.abc import MutableMapping
+
+import numpy as np
+
+CELL_SHAPES = ('hex', 'circ')
+
+# Fields of the data of a key in a cell, and their default values
+FIELD_DEFAULTS = {
+    'value'      : None,
+    'shape'      : 'hex',
+    'radius'     : 0.,
+    'offset'     : (0., 0.),
+    'zorder'     : 1,
+    'color'      : None,
+    'orientation': 0.
+}
+
+
+_TYPE_KINDS = {type(None): 'f', float: 'f', np.float64: 'f', int: 'i', np.int64: 'i', bool: 'b', str: 'O'}
+
+
+def _value_kind(value: Any) -> str:
+    # The kind of array able to hold the value without losing its type
+    kind = _TYPE_KINDS.get(type(value))
+    if kind is not None:
+        return kind
+    if value is None:
+        return 'f'
+    if isinstance(value, (bool, np.bool_)):
+        return 'b'
+    if isinstance(value, numbers.Integral):
+        return 'i'
+    if isinstance(value, numbers.Real):
+        return 'f'
+    return 'O'
+
+
+_KIND_DTYPES = {'b': np.bool_, 'i': np.int64, 'f': np.float64, 'O': object}
+
+
+class KeyData:
+
+    def __init__(self, cell_num: int, unfold: np.ndarray = None) -> None:
+        """
+        Data of a key in all cells, stored as one typed array per field
+
+        With `unfold`, only the cells of a symmetric fundamental domain are stored, where cell i reads and writes
+        the stored item `unfold[i]`, so that equivalent cells share their data (see `HexLattice.set_data`).
+        Arrays of every cell are gathered by `take`.
+
+        Fields
+        ------
+        mask: bool, whether the cell has data of this key
+        value: float64 (None as NaN), int64, bool or object array
+        shape: int8, index in CELL_SHAPES
+        radius: float64
+        offset: float64 of shape (cell_num, 2)
+        zorder: int32
+        color: int16, index in `palette`, -1 for None
+        orientation: float64
+
+        Values written through `set_value`, `set` and `set_cell` are counted by `version`.
+
+        Input
+        -----
+        cell_num: int, the number of stored items, the number of cells without `unfold`
+        unfold: np.ndarray of int of shape (number of cells,), the stored item of every cell
+        """
+        self.mask        = np.zeros(cell_num, dtype=np.bool_)
+        self.value       = np.full(cell_num, np.nan)
+        self.shape       = np.zeros(cell_num, dtype=np.int8)
+        self.radius      = np.zeros(cell_num, dtype=np.float64)
+        self.offset      = np.zeros((cell_num, 2), dtype=np.float64)
+        self.zorder      = np.ones(cell_num, dtype=np.int32)
+        self.color       = np.full(cell_num, -1, dtype=np.int16)
+        self.orientation = np.zeros(cell_num, dtype=np.float64)
+        self.palette     = list()  # Colors used by this key
+        self.version     = 0       # Counts the changes of values, for the results cached from them
+        self.unfold      = unfold  # Stored item of every cell, None if every cell is stored
+
+    def encode_color(self, color: str) -> int:
+        if color is None:
+            return -1
+        try:
+            return self.palette.index(color)
+        except ValueError:
+            self.palette.append(color)
+            return len(self.palette) - 1
+
+    def _slot(self, index):
+        # The stored items of cells
+        return index if self.unfold is None else self.unfold[index]
+
+    def take(self, name: str, index) -> np.ndarray:
+        """
+        Gather a field of given cells, one item per cell however the data is stored
+        """
+        return getattr(self, name)[self._slot(index)]
+
+    def set_value(self, index: int, value: Any) -> None:
+        self.version += 1
+        index = self._slot(index)
+        kind = _value_kind(value)
+        column_kind = self.value.dtype.kind
+        if column_kind != 'O' and kind != column_kind:
+            if not self.mask.any():
+                # Nothing stored yet, so the array type follows the value
+                self.value = np.zeros(self.value.size, dtype=_KIND_DTYPES[kind])
+            elif column_kind == 'f' and kind in 'ib':
+                pass  # Stored as float
+            elif column_kind == 'i' and kind == 'f':
+                self.value = self.value.astype(np.float64)
+            else:
+                self.value = self.value.astype(object)
+        self.value[index] = np.nan if value is None else value
+
+    def get_value(self, index: int) -> Any:
+        value = self.value[self._slot(index)]
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and value != value:
+            return None  # NaN
+        return value
+
+    def get(self, name: str, index: int) -> Any:
+        if name == 'value':
+            return self.get_value(index)
+        index = self._slot(index)
+        if name == 'shape':
+            return CELL_SHAPES[self.shape[index]]
+        elif name == 'offset':
+            return tuple(self.offset[index].tolist())
+        elif name == 'color':
+            code = self.color[index]
+            return self.palette[code] if code >= 0 else None
+        elif name in FIELD_DEFAULTS:
+            return getattr(self, name)[index].item()
+        raise KeyError(name)
+
+    def set(self, name: str, index: int, item: Any) -> None:
+        if name == 'value':
+            self.set_value(index, item)
+            return
+        index = self._slot(index)
+        if name == 'shape':
+            if item not in CELL_SHAPES:
+                raise ValueError(f"Invalid cell shape: {item}")
+            self.shape[index] = CELL_SHAPES.index(item)
+        elif name == 'color':
+            self.color[index] = self.encode_color(item)
+        elif name in FIELD_DEFAULTS:
+            getattr(self, name)[index] = item
+        else:
+            raise KeyError(name)
+
+    def set_cell(
+            self,
+            index      : int,
+            value      : Any   = None,
+            shape      : str   = 'hex',
+            radius     : float = 0.,
+            offset     : tuple = (0., 0.),
+            zorder     : int   = 1,
+            color      : str   = None,
+            orientation: float = 0.
+        ) -> None:
+        if shape not in CELL_SHAPES:
+            raise ValueError(f"Invalid cell shape: {shape}")
+        self.set_value(index, value)
+        index = self._slot(index)
+        self.shape[index] = CELL_SHAPES.index(shape)
+        self.radius[index] = radius
+        self.offset[index] = offset
+        self.zorder[index] = zorder
+        self.color[index] = self.encode_color(color)
+        self.orientation[index] = orientation
+        self.mask[index] = True
+
+    @property
+    def colors(self) -> np.ndarray:
+        """Color of every cell as an object array, None if not given"""
+        palette = np.array(self.palette + [None], dtype=object)
+        codes = self.color if self.unfold is None else self.color[self.unfold]
+        return palette[codes]  # -1 is the trailing None
+
+
+class CellData(MutableMapping):
+
+    def __init__(self, key_data: KeyData, index: int) -> None:
+        """
+        View of the data of a key in one cell, reading and writing the arrays of LatticeData
+
+        Behaves as the dict `{'value', 'shape', 'radius', 'offset', 'zorder', 'color', 'orientation'}`.
+        """
+        self._key_data = key_data
+        self._index = index
+
+    def __getitem__(self, name: str) -> Any:
+        return self._key_data.get(name, self._index)
+
+    def __setitem__(self, name: str, item: Any) -> None:
+        self._key_data.set(name, self._index, item)
+
+    def __delitem__(self, name: str) -> None:
+        raise TypeError("Fields of cell data can not be deleted.")
+
+    def __iter__(self):
+        return iter(FIELD_DEFAULTS)
+
+    def __len__(self) -> int:
+        return len(FIELD_DEFAULTS)
+
+    def __str__(self) -> str:
+        return str(dict(self))
+
+    __repr__ = __str__
+
+
+class LatticeData:
+
+    def __init__(self, cell_num: int) -> None:
+        """
+        Columnar storage of the data of all keys in a lattice, indexed by the ring-ordered cell index
+
+        Memory scales with (number of keys) x (number of cells) as packed arrays.
+        """
+        self._cell_num = cell_num
+        self._keys = dict()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __getitem__(self, key: str) -> KeyData:
+        return self._keys[key]
+
+    def keys(self) -> tuple:
+        return tuple(self._keys.keys())
+
+    def remove(self, key: str) -> None:
+        self._keys.pop(key, None)
+
+    def has(self, key: str, index: int) -> bool:
+        return key in self._keys and bool(self._keys[key].take('mask', index))
+
+    def get(self, key: str, index: int) -> CellData:
+        if not self.has(key, index):
+            raise KeyError(key)
+        return CellData(self._keys[key], index)
+
+    def set(self, key: str, index: int, **fields) -> None:
+        """
+        Set the data of a key in one cell, the fields not given take their default values
+        """
+        if key not in self._keys:
+            self._keys[key] = KeyData(self._cell_num)
+        self._keys[key].set_cell(index, **fields)
+
+    def assign(self, key: str, permutation: np.ndarray = None, unfold: np.ndarray = None, **fields) -> None:
+        """
+        Set the data of a key in all cells at once
+
+        Every field is an array of one item per cell, or a scalar shared by all cells.
+        Arrays are ring-ordered, or reordered by `array[permutation]` if permutation is given.
+        With `unfold` (see `KeyData`), arrays have one item per stored cell, and cell i takes the item `unfold[i]`.
+        """
+        size = self._cell_num if unfold is None else int(unfold.max()) + 1
+        if unfold is not None and unfold.shape != (self._cell_num,):
+            raise ValueError("Shape of unfold {} does not match {} cells".format(unfold.shape, self._cell_num))
+        key_data = KeyData(size, unfold=unfold)
+        for name, default in FIELD_DEFAULTS.items():
+            item = fields.pop(name, default)
+            if name == 'value':
+                key_data.value = self._to_value_array(item, size)
+                codes = key_data.value
+            elif name == 'shape':
+                codes = key_data.shape
+                codes[:] = self._encode(item, CELL_SHAPES, name, size)
+            elif name == 'color':
+                codes = key_data.color
+                codes[:] = self._encode(item, None, name, size, encoder=key_data.encode_color)
+            else:
+                codes = getattr(key_data, name)
+                codes[:] = self._to_array(item, name, size, codes.shape[1:])
+            if permutation is not None:
+                codes[:] = codes[permutation]
+        if fields:
+            raise KeyError(f"Invalid fields: {tuple(fields.keys())}")
+        key_data.mask[:] = True
+        self._keys[key] = key_data
+
+    def _to_array(self, item: Any, name: str, size: int, item_shape: tuple = ()) -> np.ndarray:
+        array = np.asarray(item)
+        if array.shape != item_shape and array.shape != (size,) + item_shape:
+            raise ValueError("Shape of {} {} does not match {} cells".format(
+                name, array.shape, size
+            ))
+        return array
+
+    def _to_value_array(self, value: Any, size: int) -> np.ndarray:
+        if value is None or isinstance(value, (str, numbers.Number)):
+            array = np.empty(size, dtype=_KIND_DTYPES[_value_kind(value)])
+            array[:] = np.nan if value is None else value
+            return array
+        array = self._to_array(value, 'value', size)
+        if array.dtype.kind == 'f':
+            return array.astype(np.float64)
+        if array.dtype.kind in 'iu':
+            return array.astype(np.int64)
+        if array.dtype.kind == 'b':
+            return array.copy()
+        items = list(array)
+        if all(_ is None or isinstance(_, numbers.Real) for _ in items):
+            # Numbers with None, stored as float with None as NaN
+            return np.array([np.nan if _ is None else _ for _ in items], dtype=np.float64)
+        # Strings or mixed types
+        res = np.empty(size, dtype=object)
+        res[:] = items
+        return res
+
+    def _encode(self, item: Any, choices: tuple, name: str, size: int, encoder=None) -> np.ndarray:
+        if encoder is None:
+            def encoder(choice):
+                if choice not in choices:
+                    raise ValueError(f"Invalid {name}: {choice}")
+                return choices.index(choice)
+        if item is None or isinstance(item, str):
+            return encoder(item)
+        items = list(item)
+        if len(items) != size:
+            raise ValueError("Shape of {} ({},) does not match {} cells".format(
+                name, len(items), size
+            ))
+        codes = dict()
+        return np.array([codes[_] if _ in codes else codes.setdefault(_, encoder(_)) for _ in items])
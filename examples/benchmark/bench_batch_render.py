@@ -0,0 +1,48 @@
+"""
+Benchmark of the parallel rendering of many plots, whose wall time should scale with the cores
+
+Run from the repository root:
+    python examples/benchmark/bench_batch_render.py
+
+@Author: LZK
+@Date: 2023-11-20
+"""
+import os
+import sys
+import time
+import tempfile
+
+package_path = os.getcwd()
+sys.path.append(package_path)
+import numpy as np
+from HexLattice import *
+
+RING = 7
+DPI = 150
+PLOT_NUM = 100
+
+
+def bench_batch_render(save_dir: str):
+    lattice = HexLattice(ring=RING, pitch=1.0)
+    lattice.generate_lattice()
+    for i in range(PLOT_NUM):
+        lattice.set_data(key=f'power{i}', value=np.random.rand(lattice.cell_num))
+    jobs = [
+        (f'power{i}', os.path.join(save_dir, f'power{i}.png'), {'color_map': 'jet', 'dpi': DPI, 'data_fmt': 'E'})
+        for i in range(PLOT_NUM)
+    ]
+
+    cpu_count = os.cpu_count() or 1
+    print(f"render_batch of {PLOT_NUM} plots of {RING} rings at dpi {DPI}, {cpu_count} cores")
+    serial = None
+    for workers in sorted({1, 2, 4, cpu_count}):
+        start = time.perf_counter()
+        render_batch(lattice, jobs, workers=workers)
+        cost = time.perf_counter() - start
+        serial = serial or cost
+        print(f"    {workers:3d} workers: {cost:7.2f} s, speedup {serial / cost:5.2f}")
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as save_dir:
+        bench_batch_render(save_dir)
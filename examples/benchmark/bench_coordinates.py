@@ -0,0 +1,125 @@
+"""
+Benchmark of the coordinate conversions
+
+Run from the repository root:
+    python examples/benchmark/bench_coordinates.py
+
+@Author: LZK
+@Date: 2023-11-20
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+package_path = os.getcwd()
+sys.path.append(package_path)
+import numpy as np
+from HexLattice import *
+
+RINGS = (1, 5, 10, 20, 40, 80)
+REPEAT = 5
+NUMBER = 2000
+
+
+def bench_to_ring():
+    print("CubeCoordinate.to_ring (cost per call should stay flat as the ring grows)")
+    for r in RINGS:
+        # The last cell of the ring is the worst case for a ring walk
+        point = CubeCoordinate(x=+r, y=0, z=-r).get_ring()[-1]
+        cost = min(timeit.repeat(point.to_ring, repeat=REPEAT, number=NUMBER)) / NUMBER
+        print(f"    ring {r:3d}: {cost * 1E6:8.3f} us/call")
+
+
+def bench_to_cube():
+    print("RingCoordinate.to_cube (cost per call should stay flat as the ring grows)")
+    for r in RINGS:
+        point = RingCoordinate(r=r, k=6*r-1)
+        cost = min(timeit.repeat(point.to_cube, repeat=REPEAT, number=NUMBER)) / NUMBER
+        print(f"    ring {r:3d}: {cost * 1E6:8.3f} us/call")
+
+
+def bench_neighbours():
+    point = CubeCoordinate(x=+3, y=-1, z=-2)
+    cost = min(timeit.repeat(point.get_all_neighbours, repeat=REPEAT, number=NUMBER)) / NUMBER
+    print(f"CubeCoordinate.get_all_neighbours: {cost * 1E6:8.3f} us/call")
+    cost = min(timeit.repeat(lambda: point.get_neighbour('left'), repeat=REPEAT, number=NUMBER)) / NUMBER
+    print(f"CubeCoordinate.get_neighbour     : {cost * 1E6:8.3f} us/call")
+
+
+def bench_memory(num: int = 100000):
+    tracemalloc.start()
+    # Small components, so that no int object is allocated
+    points = [CubeCoordinate(x=1, y=-1, z=0) for _ in range(num)]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    memory -= sys.getsizeof(points)
+    print(f"CubeCoordinate memory: {memory / num:6.1f} bytes/coordinate")
+
+
+def bench_batch(ring: int = 183):
+    # About 10^5 cells
+    r, k = ring_coordinates(ring)
+    print(f"Batch conversion of {r.size} cells")
+    cost = min(timeit.repeat(lambda: ring_to_cube(r, k), repeat=REPEAT, number=1))
+    print(f"    ring_to_cube     : {cost * 1E3:8.3f} ms")
+    x, y, z = ring_to_cube(r, k)
+    cost = min(timeit.repeat(lambda: cube_to_ring(x, y, z), repeat=REPEAT, number=1))
+    print(f"    cube_to_ring     : {cost * 1E3:8.3f} ms")
+    cost = min(timeit.repeat(lambda: cube_to_xy(x, y, z, pitch=1.0), repeat=REPEAT, number=1))
+    print(f"    cube_to_xy       : {cost * 1E3:8.3f} ms")
+    points = [RingCoordinate(r=r_, k=k_) for r_, k_ in zip(r.tolist(), k.tolist())]
+    cost = min(timeit.repeat(lambda: [_.to_cube() for _ in points], repeat=REPEAT, number=1))
+    print(f"    per-object loop  : {cost * 1E3:8.3f} ms (RingCoordinate.to_cube)")
+
+
+def bench_rings(ring: int = 61):
+    print(f"Rings 0-{ring - 1} around the origin")
+    cost = min(timeit.repeat(
+        lambda: [(r * CubeCoordinate(x=+1, y=0, z=-1)).get_ring() for r in range(1, ring)], repeat=REPEAT, number=1
+    ))
+    print(f"    CubeCoordinate.get_ring: {cost * 1E3:8.3f} ms")
+    cost = min(timeit.repeat(lambda: [ring_offsets(r) for r in range(ring)], repeat=REPEAT, number=1))
+    print(f"    ring_offsets (cached)  : {cost * 1E3:8.3f} ms")
+    cost = min(timeit.repeat(lambda: hex_spiral(3, -1, -2, ring), repeat=REPEAT, number=1))
+    print(f"    hex_spiral             : {cost * 1E3:8.3f} ms")
+
+
+def bench_locate(num: int = 10**7, ring: int = 15):
+    # Points spread over and beyond the lattice, binned into cells
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(-ring, ring, size=(2, num))
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    print(f"Point location of {num:.0e} points (target: 1e7 points/s)")
+    cost = min(timeit.repeat(lambda: xy_to_cube(x, y, pitch=1.0), repeat=REPEAT, number=1))
+    print(f"    xy_to_cube       : {cost * 1E3:8.1f} ms, {num / cost:.2e} points/s")
+    cost = min(timeit.repeat(lambda: lattice.locate(x, y), repeat=REPEAT, number=1))
+    print(f"    HexLattice.locate: {cost * 1E3:8.1f} ms, {num / cost:.2e} points/s")
+
+
+def bench_distance(ring: int = 15):
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    lattice.generate_lattice()
+    print(f"Distance queries on {lattice.cell_num} cells")
+    cost = min(timeit.repeat(lattice.distance_matrix, repeat=REPEAT, number=1))
+    print(f"    HexLattice.distance_matrix: {cost * 1E3:8.3f} ms")
+    cells = list(lattice.iter_cells())
+    cost = min(timeit.repeat(
+        lambda: [[a.position.distance(b.position) for b in cells] for a in cells], repeat=1, number=1
+    ))
+    print(f"    per-object loop           : {cost * 1E3:8.3f} ms (CubeCoordinate.distance)")
+    cost = min(timeit.repeat(lambda: lattice.range_index(0, ring - 1), repeat=REPEAT, number=NUMBER)) / NUMBER
+    print(f"    HexLattice.range_index    : {cost * 1E6:8.3f} us/call")
+    cost = min(timeit.repeat(lambda: lattice.line_index(1, lattice.cell_num - 1), repeat=REPEAT, number=NUMBER)) / NUMBER
+    print(f"    HexLattice.line_index     : {cost * 1E6:8.3f} us/call")
+
+
+if __name__ == '__main__':
+    bench_to_ring()
+    bench_to_cube()
+    bench_neighbours()
+    bench_memory()
+    bench_batch()
+    bench_rings()
+    bench_locate()
+    bench_distance()
@@ -0,0 +1,45 @@
+"""
+Benchmark of the import time of the package, in new processes as short-lived tools do
+
+Run from the repository root:
+    python examples/benchmark/bench_import.py
+
+@Author: LZK
+@Date: 2023-11-20
+"""
+import os
+import sys
+import time
+import subprocess
+
+package_path = os.getcwd()
+REPEAT = 5
+
+# Statements run in a new process, and the heavy modules they should not load
+CASES = (
+    ('python only'            , "pass"                                                         , ()),
+    ('import HexLattice'      , "import HexLattice"                                            , ('numpy', 'matplotlib')),
+    ('coordinate conversion'  , "from HexLattice import CubeCoordinate\n"
+                                "CubeCoordinate(x=1, y=-1, z=0).to_ring()"                     , ('numpy', 'matplotlib')),
+    ('HexLattice class'       , "from HexLattice import HexLattice\n"
+                                "HexLattice(ring=3, pitch=1.0).generate_lattice()"             , ('matplotlib',)),
+    ('from HexLattice import *', "from HexLattice import *"                                    , ('matplotlib',)),
+)
+
+
+def run(statement: str, unloaded: tuple) -> float:
+    check = "\nimport sys\nassert not [_ for _ in {} if _ in sys.modules], 'heavy module loaded'".format(list(unloaded))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', statement + check], cwd=package_path, check=True)
+    return time.perf_counter() - start
+
+
+def bench_import():
+    print(f"Wall time of a new process (best of {REPEAT})")
+    for name, statement, unloaded in CASES:
+        cost = min(run(statement, unloaded) for _ in range(REPEAT))
+        print(f"    {name:25s}: {cost * 1E3:8.1f} ms")
+
+
+if __name__ == '__main__':
+    bench_import()
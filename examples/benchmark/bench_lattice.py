@@ -0,0 +1,199 @@
+"""
+Benchmark of the lattice construction
+
+Run from the repository root:
+    python examples/benchmark/bench_lattice.py
+
+@Author: LZK
+@Date: 2023-11-20
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+package_path = os.getcwd()
+sys.path.append(package_path)
+from HexLattice import *
+
+RINGS = (6, 15, 25, 50, 100)
+REPEAT = 3
+
+
+def bench_generate_lattice():
+    print("HexLattice.generate_lattice")
+    for ring in RINGS:
+        # A new lattice every time, since a generated lattice is not generated again
+        cost = min(timeit.repeat(lambda: HexLattice(ring=ring, pitch=1.0).generate_lattice(), repeat=REPEAT, number=1))
+
+        tracemalloc.start()
+        lattice = HexLattice(ring=ring, pitch=1.0)
+        lattice.generate_lattice()
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"    ring {ring:3d} ({lattice.cell_num:6d} cells): {cost * 1E3:8.3f} ms, {memory / 1024:10.1f} KiB")
+
+
+def bench_row_appender(ring: int = 15):
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    lattice.generate_lattice()
+    cost = min(timeit.repeat(lambda: RowAppender(lattice=lattice), repeat=REPEAT, number=100)) / 100
+    print(f"RowAppender creation on {ring} rings: {cost * 1E6:8.3f} us")
+
+
+def bench_load_data(ring: int = 6, key_num: int = 8):
+    import numpy as np
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    lattice.generate_lattice()
+    data = np.random.rand(key_num, lattice.cell_num)
+    print(f"Loading {lattice.cell_num} cells x {key_num} keys")
+
+    def set_data():
+        for i in range(key_num):
+            lattice.set_data(key=f'P{i}', value=data[i])
+    cost = min(timeit.repeat(set_data, repeat=REPEAT, number=10)) / 10
+    print(f"    HexLattice.set_data : {cost * 1E6:10.3f} us")
+
+    def append():
+        appender = RowAppender(lattice=lattice)
+        for c in range(appender.cell_num):
+            for i in range(key_num):
+                appender.append(key=f'Q{i}', value=data[i][c])
+    cost = min(timeit.repeat(append, repeat=REPEAT, number=10)) / 10
+    print(f"    RowAppender.append  : {cost * 1E6:10.3f} us")
+
+
+def bench_data_memory(ring: int = 15, key_num: int = 8):
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    lattice.generate_lattice()
+    appender = RowAppender(lattice=lattice)
+    tracemalloc.start()
+    for c in range(appender.cell_num):
+        for i in range(key_num):
+            appender.append(key=f'P{i}', value=float(c))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Data of {lattice.cell_num} cells x {key_num} keys: {memory / 1024:8.1f} KiB")
+
+
+def bench_iter_cells():
+    print("HexLattice.iter_cells without generating the lattice (peak memory should stay flat)")
+    for ring in RINGS:
+        lattice = HexLattice(ring=ring, pitch=1.0)
+        tracemalloc.start()
+        for cell in lattice.iter_cells():
+            cell.central_point
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"    ring {ring:3d} ({lattice.cell_num:6d} cells): {peak / 1024:10.1f} KiB")
+
+
+def bench_neighbour_index(ring: int = 50):
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    cost = min(timeit.repeat(lambda: HexLattice(ring=ring, pitch=1.0).generate_neighbour_index(), repeat=REPEAT, number=1))
+    print(f"Neighbour table of {lattice.cell_num} cells")
+    print(f"    HexLattice.generate_neighbour_index: {cost * 1E3:8.3f} ms")
+    points = [point for r in range(ring) for point in (r * CubeCoordinate(x=+1, y=0, z=-1)).get_ring()]
+    cost = min(timeit.repeat(lambda: [point.get_all_neighbours() for point in points], repeat=REPEAT, number=1))
+    print(f"    CubeCoordinate.get_all_neighbours  : {cost * 1E3:8.3f} ms (without indices)")
+
+
+def bench_position_index(ring: int = 50, number: int = 2000):
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    lattice.generate_lattice()
+    lattice.generate_position_index()
+    point = CubeCoordinate(x=+ring-1, y=0, z=-ring+1).get_ring()[-1]
+    print(f"Position lookup in {lattice.cell_num} cells")
+    cost = min(timeit.repeat(lambda: lattice.find_cell(point), repeat=REPEAT, number=number)) / number
+    print(f"    HexLattice.find_cell        : {cost * 1E6:8.3f} us/call")
+    cost = min(timeit.repeat(lambda: lattice.lattice[point.to_ring().r][point.to_ring().k], repeat=REPEAT, number=number)) / number
+    print(f"    to_ring and lattice[r][k]   : {cost * 1E6:8.3f} us/call")
+    x, y, z = (lattice.arrays[_] for _ in ('x', 'y', 'z'))
+    cost = min(timeit.repeat(lambda: lattice.cube_index(x, y, z), repeat=REPEAT, number=1))
+    print(f"    HexLattice.cube_index arrays: {cost * 1E3:8.3f} ms for all cells")
+
+
+def bench_reduce_data(ring: int = 40):
+    import numpy as np
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    lattice.generate_lattice()
+    lattice.set_data(key='power', value=np.random.rand(lattice.cell_num))
+    print(f"Ring-averaged power of {lattice.cell_num} cells (target: over 10x faster than the loop)")
+
+    def loop():
+        return [sum(cell['power']['value'] for cell in ring_) / len(ring_) for ring_ in lattice.lattice]
+    loop_cost = min(timeit.repeat(loop, repeat=REPEAT, number=1))
+    print(f"    per-cell loop                 : {loop_cost * 1E3:8.3f} ms")
+
+    def reduce_data():
+        lattice.data['power'].version += 1  # Not cached
+        return lattice.reduce_data('power', by='ring', op='mean')
+    cost = min(timeit.repeat(reduce_data, repeat=REPEAT, number=10)) / 10
+    print(f"    HexLattice.reduce_data        : {cost * 1E3:8.3f} ms, {loop_cost / cost:6.0f}x")
+    cost = min(timeit.repeat(lambda: lattice.reduce_data('power', by='ring', op='mean'), repeat=REPEAT, number=1000)) / 1000
+    print(f"    HexLattice.reduce_data cached : {cost * 1E3:8.3f} ms")
+
+    # Cells without power, given as None, are left out
+    power = np.random.rand(lattice.cell_num).tolist()
+    power[::10] = [None] * len(power[::10])
+    lattice.set_data(key='power', value=power)
+    cost = min(timeit.repeat(reduce_data, repeat=REPEAT, number=10)) / 10
+    print(f"    HexLattice.reduce_data (None) : {cost * 1E3:8.3f} ms")
+
+
+def bench_symmetry(ring: int = 50):
+    import numpy as np
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    lattice.generate_lattice()
+    print(f"Data of {lattice.cell_num} cells stored with symmetry")
+    for symmetry in SYMMETRIES:
+        fundamental, unfold = lattice.generate_symmetry_index(symmetry)
+        value = np.random.rand(fundamental.size)
+        cost = min(timeit.repeat(
+            lambda: lattice.set_data(key='power', value=value, symmetry=symmetry), repeat=REPEAT, number=10
+        )) / 10
+        key_data = lattice.data['power']
+        memory = sum(_.nbytes for _ in vars(key_data).values() if isinstance(_, np.ndarray) and _ is not unfold)
+        unfold_cost = min(timeit.repeat(lambda: lattice.get_data('power', order='ring'), repeat=REPEAT, number=10)) / 10
+        print("    1/{:<2d} core: {:6d} items, set_data {:7.3f} ms, {:8.1f} KiB, unfolded in {:7.3f} ms".format(
+            symmetry, fundamental.size, cost * 1E3, memory / 1024, unfold_cost * 1E3
+        ))
+
+
+def bench_fold_data(ring: int = 50, key_num: int = 4):
+    import numpy as np
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    lattice.generate_lattice()
+    power = np.random.rand(key_num, lattice.cell_num)
+    for i in range(key_num):
+        lattice.set_data(key=f'P{i}', value=power[i], order='ring')
+    keys = [f'P{i}' for i in range(key_num)]
+    orbits = lattice.generate_symmetry_orbits(6).tolist()
+    print(f"Folding {key_num} keys of {lattice.cell_num} cells into the 1/6 core")
+
+    def loop():
+        result = list()
+        for i in range(key_num):
+            for orbit in orbits:
+                values = [power[i][c] for c in orbit]
+                mean = sum(values) / len(values)
+                result.append((mean, max(abs(v - mean) for v in values)))
+        return result
+    loop_cost = min(timeit.repeat(loop, repeat=REPEAT, number=1))
+    print(f"    per-cell loop       : {loop_cost * 1E3:8.3f} ms")
+    cost = min(timeit.repeat(lambda: lattice.fold_data(keys, symmetry=6), repeat=REPEAT, number=10)) / 10
+    print(f"    HexLattice.fold_data: {cost * 1E3:8.3f} ms, {loop_cost / cost:6.0f}x")
+
+
+if __name__ == '__main__':
+    bench_generate_lattice()
+    bench_row_appender()
+    bench_load_data()
+    bench_data_memory()
+    bench_iter_cells()
+    bench_neighbour_index()
+    bench_position_index()
+    bench_reduce_data()
+    bench_symmetry()
+    bench_fold_data()
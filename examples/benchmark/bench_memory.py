@@ -0,0 +1,68 @@
+"""
+Benchmark of the memory of consecutive plots, which should stay flat unless figures are kept
+
+Run from the repository root:
+    python examples/benchmark/bench_memory.py
+
+@Author: LZK
+@Date: 2023-11-20
+"""
+import os
+import sys
+import gc
+import resource
+import tempfile
+
+package_path = os.getcwd()
+sys.path.append(package_path)
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from HexLattice import *
+
+RING = 7
+DPI = 600
+PLOT_NUM = 200
+MAX_GROWTH = 20.  # MB, allowed growth of resident memory after the first 50 plots
+
+
+def resident_memory() -> float:
+    """Resident memory of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        # Peak instead of current memory, out of Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def bench_memory(save_dir: str, **plot_kwargs) -> float:
+    lattice = HexLattice(ring=RING, pitch=1.0)
+    lattice.generate_lattice()
+    lattice.set_data(key='power', value=np.random.rand(lattice.cell_num))
+    save_path = os.path.join(save_dir, 'power.png')
+
+    memory = list()
+    with lattice:
+        for i in range(PLOT_NUM):
+            lattice.plot(keys='power', color_map='jet', save_path=save_path, dpi=DPI, **plot_kwargs)
+            if i % 50 == 49:
+                gc.collect()
+                memory.append(resident_memory())
+    growth = memory[-1] - memory[0]
+    print("    {:40s}: {} MB, growth {:7.1f} MB".format(
+        str(plot_kwargs), ' -> '.join(f'{_:.0f}' for _ in memory), growth
+    ))
+    return growth
+
+
+if __name__ == '__main__':
+    print(f"Resident memory over {PLOT_NUM} plots of {RING} rings at dpi {DPI}")
+    with tempfile.TemporaryDirectory() as save_dir:
+        growth = [
+            bench_memory(save_dir, figure_policy='close'),
+            bench_memory(save_dir, figure_policy='reuse'),
+            bench_memory(save_dir, backend='agg'),
+        ]
+    if max(growth) > MAX_GROWTH:
+        sys.exit(f"Memory grows by more than {MAX_GROWTH} MB")
@@ -0,0 +1,94 @@
+"""
+Benchmark of the lattice plotting
+
+Run from the repository root:
+    python examples/benchmark/bench_plot.py
+
+@Author: LZK
+@Date: 2023-11-20
+"""
+import os
+import sys
+import time
+import tempfile
+
+package_path = os.getcwd()
+sys.path.append(package_path)
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from HexLattice import *
+
+RING = 15
+DPI = 600
+
+
+def make_lattice(ring: int = RING) -> HexLattice:
+    lattice = HexLattice(ring=ring, pitch=1.0)
+    lattice.generate_lattice()
+    lattice.set_data(key='power', value=np.random.rand(lattice.cell_num))
+    return lattice
+
+
+def bench_plot(save_dir: str):
+    lattice = make_lattice()
+    save_path = os.path.join(save_dir, 'power.png')
+    print(f"HexLattice.plot of {lattice.cell_num} cells at dpi {DPI}")
+    for show_wireframe, show_text in ((True, True), (False, True), (True, False)):
+        start = time.perf_counter()
+        lattice.plot(
+            keys='power', color_map='jet', save_path='--supress', dpi=DPI,
+            show_wireframe=show_wireframe, show_text=show_text
+        )
+        build = time.perf_counter() - start
+        axes = lattice.get_matplotlib_axes()
+        artist_num = len(axes.lines) + len(axes.collections) + len(axes.patches) + len(axes.texts)
+
+        start = time.perf_counter()
+        lattice.get_matplotlib_figure().savefig(save_path)
+        save = time.perf_counter() - start
+        print(f"    wireframe {str(show_wireframe):5s}, text {str(show_text):5s}: build {build:6.3f} s, savefig {save:6.3f} s, {artist_num:6d} artists")
+
+
+def bench_geometry(save_dir: str):
+    # Layered solid fillings of every cell, as in the geometry plots
+    lattice = HexLattice(ring=RING, pitch=1.0)
+    lattice.generate_lattice()
+    lattice.set_data(key='tube', cell_radius=0.9, color='#AAAAAA', orientation=np.pi/6)
+    lattice.set_data(key='clad', cell_shape='circ', cell_radius=0.4, zorder=3, color='cyan')
+    lattice.set_data(key='fuel', cell_shape='circ', cell_radius=0.3, zorder=5, color='red')
+    save_path = os.path.join(save_dir, 'geometry.png')
+    print(f"HexLattice.plot of {lattice.cell_num} cells x 3 layers at dpi {DPI}")
+    start = time.perf_counter()
+    lattice.plot(keys='tube&clad&fuel', color_map='jet', save_path='--supress', dpi=DPI, show_colorbar=False)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    lattice.get_matplotlib_figure().savefig(save_path)
+    save = time.perf_counter() - start
+    print(f"    build {build:6.3f} s, savefig {save:6.3f} s, {len(lattice.get_matplotlib_axes().collections):3d} collections")
+
+
+def bench_template(save_dir: str, key_num: int = 8):
+    # Sweep of many keys over one geometry
+    lattice = make_lattice()
+    for i in range(key_num):
+        lattice.set_data(key=f'power{i}', value=np.random.rand(lattice.cell_num))
+    print(f"Sweep of {key_num} keys over {lattice.cell_num} cells at dpi {DPI}")
+
+    start = time.perf_counter()
+    for i in range(key_num):
+        lattice.plot(keys=f'power{i}', color_map='jet', save_path=os.path.join(save_dir, f'plot{i}.png'), dpi=DPI)
+    print(f"    HexLattice.plot       : {(time.perf_counter() - start) / key_num:6.3f} s/key")
+
+    start = time.perf_counter()
+    template = RenderTemplate(lattice, color_map='jet', dpi=DPI)
+    for i in range(key_num):
+        template.render(key=f'power{i}', save_path=os.path.join(save_dir, f'template{i}.png'))
+    print(f"    RenderTemplate.render : {(time.perf_counter() - start) / key_num:6.3f} s/key")
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as save_dir:
+        bench_plot(save_dir)
+        bench_geometry(save_dir)
+        bench_template(save_dir)
@@ -8,40 +8,34 @@ from power_data import *
 
 lattice = HexLattice(ring=CORE_RING, pitch=2 * LATTICE_PITCH)
 lattice.generate_lattice()
-appender = RowAppender(lattice=lattice)
-
-max_relerr : list[float] = [0. for _ in range(1 + MAX_ANISO_ORDER)]
-max_postive_err : float = 0.
-max_negative_err : float = 0.
 
 # #################################################################
 #                    Add data into lattice
 # #################################################################
-r : int = CORE_RING - 1
 print("Processing data ...")
-for c in range(appender.cell_num):
-    for i in range(1 + MAX_ANISO_ORDER):
-        # Append power of Pi into lattice
-        appender.append(key = f'P{i}', value = power_p[i][c])
-
-        # Append power of reference into lattice
-        relerr: float = (power_p[i][c] - power_ref[c]) \
-            / power_ref[c] if power_ref[c] > 0. else 0.
-        appender.append(
-            key = f'relerr{i}',
-            value = relerr
-        )
+power_ref_ : np.ndarray = np.asarray(power_ref)
+relerr : np.ndarray = np.zeros_like(power_p)
+positive = power_ref_ > 0.
+relerr[:, positive] = (power_p[:, positive] - power_ref_[positive]) / power_ref_[positive]
 
-        # Record the maximum relative error
-        if abs(relerr) > max_relerr[i]:
-            max_relerr[i] = abs(relerr)
-        if relerr > max_postive_err: max_postive_err = relerr
-        if relerr < max_negative_err: max_negative_err = relerr
+for i in range(1 + MAX_ANISO_ORDER):
+    # Power of Pi and its relative error to reference, row-by-row
+    lattice.set_data(key = f'P{i}', value = power_p[i])
+    lattice.set_data(key = f'relerr{i}', value = relerr[i])
 
+# Record the maximum relative error
+max_relerr : np.ndarray = np.abs(relerr).max(axis=1)
+max_postive_err : float = max(relerr.max(), 0.)
+max_negative_err : float = min(relerr.min(), 0.)
 
 for i in range(1 + MAX_ANISO_ORDER):
     print(f"Maximum relative error of P{i} is {max_relerr[i]}")
 
+# Symmetry breaking of the solutions, folded into the 1/6 core
+_, asymmetry = lattice.fold_data([f'P{i}' for i in range(1 + MAX_ANISO_ORDER)], symmetry=6, relative=True)
+for i in range(1 + MAX_ANISO_ORDER):
+    print(f"Maximum asymmetry of P{i} is {np.nanmax(asymmetry[i])}")
+
 
 plot_directory = os.path.join(os.getcwd(), 'gallery')
 if not os.path.exists(plot_directory):
@@ -50,26 +44,25 @@ if not os.path.exists(plot_directory):
 # #################################################################
 #                              Plot
 # #################################################################
+# The same geometry for all the cases, rendered from one template
+template = RenderTemplate(
+    lattice,
+    color_map = 'jet',
+    figsize = (11, 8),
+    text_size = 8,
+    dpi = 600,
+    max_ring_idx = 7
+)
 for i in range(1 + MAX_ANISO_ORDER):
     print(f"Plotting P{i} case ...")
-    lattice.plot(
-        keys = f'P{i}',
-        color_map = 'jet',
+    template.render(
+        key = f'P{i}',
         save_path = os.path.join(plot_directory, f'power_p{i}.png'),
-        figsize = (11, 8),
-        text_size = 8,
-        dpi = 600,
-        max_ring_idx = 7,
         data_fmt = 'E'
     )
-    lattice.plot(
-        keys = f'relerr{i}',
-        color_map = 'jet',
+    template.render(
+        key = f'relerr{i}',
         save_path = os.path.join(plot_directory, f'power_relerr{i}.png'),
-        figsize = (11, 8),
-        text_size = 8,
-        dpi = 600,
-        max_ring_idx = 7,
         clim = (max_negative_err, max_postive_err),
         data_fmt = '%'
     )